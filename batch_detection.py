@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from src.batch import detect_dices_batch
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Runs the dice detection on a video file or image directory"
+    )
+    parser.add_argument("source", help="video file or directory of images")
+    parser.add_argument("output", help="output directory for the detections")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--backend", default="opencv", choices=["skimage", "opencv"])
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    nb_frames, nb_dices, skipped = detect_dices_batch(
+        args.source,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        backend=args.backend,
+    )
+    elapsed = time.perf_counter() - t0
+
+    for path in skipped:
+        print(f"Skipped {path}: could not be read")
+
+    print(
+        f"Detected {nb_dices} dices on {nb_frames} frames in {elapsed:.1f}s"
+        f" ({nb_frames / elapsed:.1f} frames/s)"
+    )
@@ -0,0 +1,309 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import skimage
+
+from benchmarks.synthetic import render_frame, score_detections
+from src.background import BackgroundDetector
+from src.ip import detect_dices, segment_frame
+from src.profiling import PROFILER
+
+RESOLUTIONS = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+
+
+def benchmark_detection(
+    shape, backend="skimage", downscale=1, nb_frames=20, nb_dices=8, repeat=5, seed=0
+):
+    """Times detect_dices on synthetic frames and scores its detections against
+    their ground truth. The frames are timed with the profiler disabled, then
+    detected once more with it enabled for the latency of each stage.
+
+    Args:
+        shape (tupple(int)): Frame size (height, width)
+        backend (str, optional): Segmentation backend, see segment_frame, or
+            "background" for BackgroundDetector, calibrated on empty frames of a
+            table shared by all the frames, whose brightness varies by up to 20%.
+            Defaults to "skimage".
+        downscale (int, optional): Downscaling factor, see detect_dices. Ignored
+            by the background detector. Defaults to 1.
+        nb_frames (int, optional): Number of frames, rendered with the seeds
+            following seed. Defaults to 20.
+        nb_dices (int, optional): Number of dices per frame. Defaults to 8.
+        repeat (int, optional): Number of timed detections per frame.
+            Defaults to 5.
+        seed (int, optional): Seed of the first frame. Defaults to 0.
+
+    Returns:
+        dict: Latencies in milliseconds, throughput, accuracy and stages
+    """
+    if backend == "background":
+        rng = np.random.default_rng(seed)
+        frames = [
+            render_frame(
+                shape,
+                nb_dices,
+                seed + i,
+                brightness=rng.uniform(0.8, 1.2),
+                table_seed=seed,
+            )
+            for i in range(nb_frames)
+        ]
+        detector = BackgroundDetector()
+        detector.calibrate(
+            render_frame(shape, 0, seed + nb_frames + i, table_seed=seed)[0]
+            for i in range(10)
+        )
+        detect = detector.detect
+    else:
+        frames = [render_frame(shape, nb_dices, seed + i) for i in range(nb_frames)]
+        detect = lambda frame: detect_dices(frame, backend, downscale)
+    detect(frames[0][0])  # warm up
+
+    PROFILER.disable()
+    latencies = []
+    for frame, _ in frames:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            detect(frame)
+            latencies.append(time.perf_counter() - t0)
+
+    PROFILER.reset()
+    PROFILER.enable()
+    scores = [score_detections(detect(f), t) for f, t in frames]
+    PROFILER.disable()
+    stages = {name: s["mean_ms"] for name, s in PROFILER.summary().items()}
+
+    ms = 1000 * np.array(latencies)
+    totals = {k: sum(s[k] for s in scores) for k in scores[0]}
+    return {
+        "resolution": f"{shape[1]}x{shape[0]}",
+        "backend": backend,
+        "downscale": downscale,
+        "frames": nb_frames,
+        "dices_per_frame": nb_dices,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "fps": float(1000 / ms.mean()),
+        "precision": totals["matched"] / max(totals["detections"], 1),
+        "recall": totals["matched"] / totals["dices"],
+        "value_accuracy": totals["correct"] / totals["dices"],
+        "frame_accuracy": float(
+            np.mean([s["correct"] == s["dices"] == s["detections"] for s in scores])
+        ),
+        "stages_ms": stages,
+    }
+
+
+def check_backends(shape, nb_frames=5, seed=0):
+    """Compares the skimage and opencv backends on synthetic frames and on flat
+    frames, such as a covered lens or a blank shot.
+
+    Args:
+        shape (tupple(int)): Frame size (height, width)
+        nb_frames (int, optional): Number of synthetic frames. Defaults to 5.
+        seed (int, optional): Seed of the first frame. Defaults to 0.
+
+    Returns:
+        list[str]: Description of each difference
+    """
+    frames = [
+        (f"frame {seed + i}", render_frame(shape, 8, seed + i)[0])
+        for i in range(nb_frames)
+    ]
+    frames += [
+        (f"flat {v}", np.full((*shape, 3), v, dtype=np.uint8)) for v in (0, 128, 255)
+    ]
+
+    differences = []
+    for name, frame in frames:
+        _, sk_norm, sk_bin, _, _ = segment_frame(frame, "skimage")
+        _, cv_norm, cv_bin, _, _ = segment_frame(frame, "opencv")
+        if not np.array_equal(sk_bin, cv_bin):
+            differences.append(
+                f"{name}: binary images differ on {np.mean(sk_bin != cv_bin):.2%} "
+                "of the pixels"
+            )
+        if name.startswith("flat") and not np.array_equal(sk_norm, cv_norm):
+            differences.append(f"{name}: normalized images differ")
+        # The backends label the regions in different orders
+        sk, cv = (
+            sorted(zip(map(tuple, res.bboxes.tolist()), res.values.tolist()))
+            for res in (detect_dices(frame, "skimage"), detect_dices(frame, "opencv"))
+        )
+        if sk != cv:
+            differences.append(f"{name}: detections differ")
+
+    return differences
+
+
+def benchmark_history_memory(shape, nb_frames=300, keep_crops=False, fps=30, seed=0):
+    """Measures with tracemalloc the memory retained by a history of detection
+    results, each frame being a fresh buffer as a camera would deliver, and
+    extrapolates it to a one hour session.
+
+    Args:
+        shape (tupple(int)): Frame size (height, width)
+        nb_frames (int, optional): Number of results kept. Defaults to 300.
+        keep_crops (bool, optional): Results keep the crops of the dices.
+            Defaults to False.
+        fps (float, optional): Frame rate of the session. Defaults to 30.
+        seed (int, optional): Seed of the frames. Defaults to 0.
+
+    Returns:
+        dict: Bytes retained per frame and MiB retained after an hour
+    """
+    source = [render_frame(shape, 8, seed + i)[0] for i in range(4)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    history = []
+    for i in range(nb_frames):
+        frame = source[i % len(source)].copy()
+        history.append(detect_dices(frame, "opencv", keep_crops=keep_crops))
+        del frame
+    per_frame = (tracemalloc.get_traced_memory()[0] - before) / nb_frames
+    tracemalloc.stop()
+
+    return {
+        "resolution": f"{shape[1]}x{shape[0]}",
+        "keep_crops": keep_crops,
+        "bytes_per_frame": per_frame,
+        "hour_mib": per_frame * fps * 3600 / 2**20,
+    }
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Compares results to a baseline run of the same configurations.
+
+    Args:
+        results (list[dict]): Results of benchmark_detection
+        baseline (list[dict]): Results of a previous run
+        tolerance (float, optional): Relative slowdown tolerated. Defaults to 0.1.
+
+    Returns:
+        list[str]: Description of each regression
+    """
+    key = lambda r: (r["resolution"], r["backend"], r["downscale"])
+    previous = {key(r): r for r in baseline}
+
+    regressions = []
+    for r in results:
+        b = previous.get(key(r))
+        if b is None:
+            continue
+        name = "{} {} x{}".format(*key(r))
+        if r["mean_ms"] > b["mean_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {b['mean_ms']:.2f} -> {r['mean_ms']:.2f} ms per frame"
+            )
+        for metric in ("recall", "value_accuracy"):
+            if r[metric] < b[metric]:
+                regressions.append(
+                    f"{name}: {metric} {b[metric]:.3f} -> {r[metric]:.3f}"
+                )
+
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Detection latency and accuracy on synthetic frames"
+    )
+    parser.add_argument(
+        "--resolutions", nargs="+", default=list(RESOLUTIONS), choices=RESOLUTIONS
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["skimage", "opencv"],
+        choices=["skimage", "opencv", "background"],
+    )
+    parser.add_argument("--downscales", nargs="+", type=int, default=[1])
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--dices", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="detection_benchmark.json")
+    parser.add_argument(
+        "--baseline", help="previous output, exits with 1 on a regression"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="measures the memory retained by a history of results instead",
+    )
+    parser.add_argument(
+        "--check-backends",
+        action="store_true",
+        help="checks that both backends give the same detections instead, "
+        "exits with 1 otherwise",
+    )
+    args = parser.parse_args()
+
+    if args.check_backends:
+        differences = []
+        for resolution in args.resolutions:
+            differences += check_backends(RESOLUTIONS[resolution], seed=args.seed)
+        for difference in differences:
+            print("difference:", difference)
+        sys.exit(1 if differences else 0)
+
+    if args.memory:
+        for resolution in args.resolutions:
+            for keep_crops in (False, True):
+                res = benchmark_history_memory(
+                    RESOLUTIONS[resolution], keep_crops=keep_crops, seed=args.seed
+                )
+                print(
+                    f"{res['resolution']:>9} crops={keep_crops!s:<5}: "
+                    f"{res['bytes_per_frame']:9.0f} B per frame, "
+                    f"{res['hour_mib']:9.1f} MiB per hour at 30 fps"
+                )
+        sys.exit(0)
+
+    results = []
+    for resolution in args.resolutions:
+        for backend in args.backends:
+            for downscale in args.downscales:
+                res = benchmark_detection(
+                    RESOLUTIONS[resolution],
+                    backend,
+                    downscale,
+                    args.frames,
+                    args.dices,
+                    args.repeat,
+                    args.seed,
+                )
+                results.append(res)
+                print(
+                    f"{res['resolution']:>9} {backend:>10} x{downscale}: "
+                    f"{res['mean_ms']:7.2f} ms ({res['fps']:6.1f} fps), "
+                    f"recall {res['recall']:.3f}, values {res['value_accuracy']:.3f}"
+                )
+
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "skimage": skimage.__version__,
+        "seed": args.seed,
+    }
+    with open(args.output, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for regression in regressions:
+            print("regression:", regression)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,223 @@
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import render_frame
+from src.framebus import FrameBus
+from src.ip import detect_dices
+
+
+def memory_kib():
+    """Current and peak resident memory of the calling process, read from /proc
+    (Linux only).
+
+    Returns:
+        tupple(int, int): VmRSS and VmHWM in KiB, None if unavailable
+    """
+    res = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    res[line[:5]] = int(line.split()[1])
+    except OSError:
+        return None, None
+    return res.get("VmRSS"), res.get("VmHWM")
+
+
+def peek_bus(name):
+    """Attaches to a bus, reads its newest frame and detaches"""
+    bus = FrameBus.attach(name)
+    bus.latest()
+    bus.close()
+
+
+def check_consumer_exit(bus, ctx):
+    """Checks that a consumer process exiting leaves the bus in place, for other
+    consumers to attach to and for the producer to free.
+
+    Args:
+        bus (FrameBus): Bus created by the calling process
+        ctx (multiprocessing.context.BaseContext): Context of the consumer, whose
+            start method isn't fork for it to have its own resource tracker
+    """
+    p = ctx.Process(target=peek_bus, args=(bus.name,))
+    p.start()
+    p.join()
+    if p.exitcode != 0:
+        raise RuntimeError(f"Consumer exited with {p.exitcode}")
+    FrameBus.attach(bus.name).close()
+
+
+def consume_bus(name, results, detect, ready):
+    """Reads the newest frames of a bus until the producer closes it"""
+    rss, _ = memory_kib()
+    bus = FrameBus.attach(name)
+    ready.release()
+    latencies, last, torn = [], -1, 0
+    while True:
+        frame = bus.wait(last, timeout=10)
+        if frame is None:
+            break
+        last, timestamp, view = frame
+        latencies.append(time.perf_counter() - timestamp)
+        if detect:
+            detect_dices(view, "opencv")
+        torn += not bus.valid(last)
+        del frame, view
+    bus.close()
+    results.put(
+        {"latencies": latencies, "torn": torn, "memory": (rss, memory_kib()[1])}
+    )
+
+
+def consume_queue(frames, results, detect, ready):
+    """Reads pickled frames from a queue until the producer sends None"""
+    rss, _ = memory_kib()
+    ready.release()
+    latencies = []
+    while True:
+        item = frames.get(timeout=10)
+        if item is None:
+            break
+        _, timestamp, frame = item
+        latencies.append(time.perf_counter() - timestamp)
+        if detect:
+            detect_dices(frame, "opencv")
+        del item, frame
+    results.put({"latencies": latencies, "torn": 0, "memory": (rss, memory_kib()[1])})
+
+
+def benchmark_transport(
+    transport,
+    shape,
+    nb_frames,
+    fps,
+    nb_consumers=1,
+    detect=False,
+    seed=0,
+    start_method="spawn",
+):
+    """Sends frames from the calling process to consumer processes, through a
+    FrameBus or through pickled multiprocessing queues, one per consumer, dropping
+    the frames a consumer's queue has no room for.
+
+    Args:
+        transport (str): "bus" or "queue"
+        shape (tupple(int)): Frame shape (height, width, channels)
+        nb_frames (int): Number of frames sent
+        fps (float): Rate at which the frames are sent, 0 for as fast as possible
+        nb_consumers (int, optional): Number of consumer processes. Defaults to 1.
+        detect (bool, optional): Consumers run detect_dices on each frame.
+            Defaults to False.
+        seed (int, optional): Seed of the synthetic frames. Defaults to 0.
+        start_method (str, optional): Start method of the consumer processes.
+            Forked consumers share the resource tracker of the producer, spawned
+            ones, like independent processes, have their own. The bus transport
+            checks first that a consumer exiting leaves the bus in place, see
+            check_consumer_exit. Defaults to "spawn".
+
+    Returns:
+        dict: Latencies from send to receive in milliseconds, frames received and
+            memory of the processes in MiB
+    """
+    source = [render_frame(shape[:2], 8, seed + i)[0] for i in range(8)]
+    ctx = mp.get_context(start_method)
+    results = ctx.Queue()
+    ready = ctx.Semaphore(0)
+
+    if transport == "bus":
+        bus = FrameBus.create(shape)
+        check_consumer_exit(bus, ctx)
+        consumers = [
+            ctx.Process(target=consume_bus, args=(bus.name, results, detect, ready))
+            for _ in range(nb_consumers)
+        ]
+    else:
+        queues = [ctx.Queue(maxsize=2) for _ in range(nb_consumers)]
+        consumers = [
+            ctx.Process(target=consume_queue, args=(q, results, detect, ready))
+            for q in queues
+        ]
+    for p in consumers:
+        p.start()
+    for _ in consumers:
+        ready.acquire()
+
+    t0 = time.perf_counter()
+    for i in range(nb_frames):
+        if fps:
+            time.sleep(max(t0 + i / fps - time.perf_counter(), 0.0))
+        frame = source[i % len(source)]
+        if transport == "bus":
+            bus.write(frame)
+        else:
+            for q in queues:
+                try:
+                    q.put_nowait((i, time.perf_counter(), frame))
+                except queue.Full:
+                    pass
+    elapsed = time.perf_counter() - t0
+
+    if transport == "bus":
+        bus.close()
+    else:
+        for q in queues:
+            q.put(None)
+    res = [results.get() for _ in consumers]
+    for p in consumers:
+        p.join()
+
+    ms = 1000 * np.concatenate([r["latencies"] for r in res])
+    return {
+        "transport": transport,
+        "consumers": nb_consumers,
+        "frames_sent": nb_frames,
+        "send_fps": nb_frames / elapsed,
+        "frames_received": len(ms) / nb_consumers,
+        "torn": sum(r["torn"] for r in res),
+        "latency_ms": {f"p{q}": float(np.percentile(ms, q)) for q in (50, 95, 99)},
+        "consumer_peak_mib": max(r["memory"][1] - r["memory"][0] for r in res) / 1024,
+        "producer_peak_mib": memory_kib()[1] / 1024,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Frame transport between processes: FrameBus vs pickled queues"
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0, help="0: unpaced")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--consumers", type=int, default=1)
+    parser.add_argument(
+        "--detect", action="store_true", help="consumers run detect_dices"
+    )
+    parser.add_argument(
+        "--transports", nargs="+", default=["bus", "queue"], choices=["bus", "queue"]
+    )
+    parser.add_argument(
+        "--start-method",
+        default="spawn",
+        choices=mp.get_all_start_methods(),
+        help="start method of the consumers",
+    )
+    args = parser.parse_args()
+
+    for transport in args.transports:
+        res = benchmark_transport(
+            transport,
+            (args.height, args.width, 3),
+            args.frames,
+            args.fps,
+            args.consumers,
+            args.detect,
+            start_method=args.start_method,
+        )
+        print(json.dumps(res, indent=4))
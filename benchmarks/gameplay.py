@@ -0,0 +1,121 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.gameplay import Bid, CpuPlayer, Game
+from src.simulation import simulate_games
+
+
+def benchmark_games(nb_games, nb_cpus, nb_dices, seed=0):
+    """Plays headless games where a CpuPlayer takes the human player's seat.
+
+    Args:
+        nb_games (int): Number of games to play
+        nb_cpus (int): Number of computer-controlled opponents
+        nb_dices (int): Initial number of dices for each player
+        seed (int, optional): Seed of the random generators. Defaults to 0.
+
+    Returns:
+        dict: Number of games and rounds played, and elapsed time in seconds
+    """
+    rng = np.random.default_rng(seed)
+
+    nb_rounds = 0
+    t0 = time.perf_counter()
+    for _ in range(nb_games):
+        seat = CpuPlayer(name="seat0", nb_dices=nb_dices, headless=True, rng=rng)
+        game = Game(None, nb_cpus, nb_dices, headless=True, human_player=seat, rng=rng)
+        game.play()
+        nb_rounds += game.round - 1
+    elapsed = time.perf_counter() - t0
+
+    return {"games": nb_games, "rounds": nb_rounds, "seconds": elapsed}
+
+
+def benchmark_vectorized(nb_games, nb_cpus, nb_dices, seed=0):
+    """Simulates the same games with the vectorized batch simulator.
+
+    Args:
+        nb_games (int): Number of games to play
+        nb_cpus (int): Number of computer-controlled opponents
+        nb_dices (int): Initial number of dices for each player
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        dict: Number of games and rounds played, and elapsed time in seconds
+    """
+    t0 = time.perf_counter()
+    _, nb_rounds = simulate_games(nb_games, nb_cpus, nb_dices, seed)
+    elapsed = time.perf_counter() - t0
+
+    return {"games": nb_games, "rounds": int(nb_rounds.sum()), "seconds": elapsed}
+
+
+def benchmark_memory(nb_cpus, nb_dices, nb_rounds=1000, seed=0):
+    """Measures the memory of a game state and the memory allocated by its rounds
+    with tracemalloc.
+
+    Args:
+        nb_cpus (int): Number of computer-controlled opponents
+        nb_dices (int): Initial number of dices for each player
+        nb_rounds (int, optional): Number of rounds played, without removing the
+            loosers' dices. Defaults to 1000.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        dict: Bytes of a game state, of a bid, and peak bytes allocated by a round
+    """
+    rng = np.random.default_rng(seed)
+
+    tracemalloc.start()
+    seat = CpuPlayer(name="seat0", nb_dices=nb_dices, headless=True, rng=rng)
+    game = Game(None, nb_cpus, nb_dices, headless=True, human_player=seat, rng=rng)
+    game.play_round()
+    state = tracemalloc.get_traced_memory()[0]
+
+    peaks = []
+    for _ in range(nb_rounds):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        game.play_round()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+
+    before = tracemalloc.get_traced_memory()[0]
+    bids = [Bid(None, 1, 1, None) for _ in range(10000)]
+    bid = (tracemalloc.get_traced_memory()[0] - before) / len(bids)
+    tracemalloc.stop()
+
+    return {"state": state, "bid": bid, "round_peak": float(np.mean(peaks))}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Headless game throughput")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--cpus", type=int, default=4)
+    parser.add_argument("--dices", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--vectorized", action="store_true", help="use src.simulation.simulate_games"
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="measures memory with tracemalloc"
+    )
+    args = parser.parse_args()
+
+    if args.memory:
+        res = benchmark_memory(args.cpus, args.dices, seed=args.seed)
+        print(
+            f"game state: {res['state']} B, bid: {res['bid']:.0f} B, "
+            f"peak per round: {res['round_peak']:.0f} B"
+        )
+    else:
+        benchmark = benchmark_vectorized if args.vectorized else benchmark_games
+        res = benchmark(args.games, args.cpus, args.dices, args.seed)
+        print(
+            f"{res['games']} games, {res['rounds']} rounds in {res['seconds']:.2f}s: "
+            f"{res['games'] / res['seconds']:.0f} games/s, "
+            f"{res['rounds'] / res['seconds']:.0f} rounds/s"
+        )
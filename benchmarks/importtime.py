@@ -0,0 +1,93 @@
+import argparse
+import subprocess
+import sys
+
+# Import time budget in milliseconds of each entry point, and modules it must not
+# import. The game and simulation paths only need numpy, the vision stack only
+# needs OpenCV until the skimage backend is used.
+VISION = ("cv2", "skimage", "scipy", "matplotlib")
+BUDGETS = {
+    "liars_dice": (250, VISION),
+    "src.simulation": (250, VISION),
+    "src.tournament": (250, VISION),
+    "src.solver": (250, VISION),
+    "replay_log": (300, VISION),
+    "serve": (300, VISION),
+    "src.camera_utils": (400, ("skimage", "scipy", "matplotlib")),
+    "src.ip": (400, ("skimage", "scipy", "matplotlib")),
+    "dice_detection": (400, ("skimage", "scipy", "matplotlib")),
+}
+
+
+def import_time(module, repeat=3):
+    """Measures the import time of a module in fresh interpreters with
+    python -X importtime.
+
+    Args:
+        module (str): Module to import
+        repeat (int, optional): Number of interpreters, the fastest import being
+            kept. Defaults to 3.
+
+    Returns:
+        tupple(float, set[str]): Import time in milliseconds, and top-level
+            packages imported
+    """
+    best, packages = None, set()
+    for _ in range(repeat):
+        res = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in res.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            packages.add(name.strip().split(".")[0])
+            if name.strip() == module:
+                ms = int(cumulative) / 1000
+                best = ms if best is None else min(best, ms)
+
+    return best, packages
+
+
+def check_budgets(budgets=BUDGETS, scale=1.0, repeat=3):
+    """Checks the import time budgets.
+
+    Args:
+        budgets (dict, optional): Budget in milliseconds and forbidden packages of
+            each module. Defaults to BUDGETS.
+        scale (float, optional): Factor applied to the budgets, for slower
+            machines. Defaults to 1.0.
+        repeat (int, optional): Number of measures per module. Defaults to 3.
+
+    Returns:
+        list[str]: Description of each budget exceeded
+    """
+    failures = []
+    for module, (budget, forbidden) in budgets.items():
+        ms, packages = import_time(module, repeat)
+        leaked = sorted(packages.intersection(forbidden))
+        print(f"{module:>18}: {ms:7.1f} ms (budget {budget * scale:.0f} ms)")
+        if ms > budget * scale:
+            failures.append(f"{module} imports in {ms:.1f} ms")
+        if leaked:
+            failures.append(f"{module} imports {', '.join(leaked)}")
+
+    return failures
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Import time budget check")
+    parser.add_argument("modules", nargs="*", help="defaults to all the budgets")
+    parser.add_argument("--scale", type=float, default=1.0, help="budget factor")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    budgets = {m: BUDGETS[m] for m in args.modules} if args.modules else BUDGETS
+    failures = check_budgets(budgets, args.scale, args.repeat)
+    for failure in failures:
+        print("over budget:", failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Server started by the load generator, at the root of the repository
+SERVER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "serve.py"
+)
+
+
+def rss_kib(pid):
+    """Resident memory of a process, read from /proc (Linux only).
+
+    Returns:
+        int: Resident memory in KiB, None if unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+async def wait_server(host, port, timeout=10.0):
+    """Waits for the server to accept connections"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def join(host, port, nb_cpus, name):
+    """Opens a table.
+
+    Returns:
+        tupple(asyncio.StreamReader, asyncio.StreamWriter): Connection
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        (json.dumps({"type": "join", "name": name, "cpus": nb_cpus}) + "\n").encode()
+    )
+    await writer.drain()
+    return reader, writer
+
+
+async def idle_client(host, port, nb_cpus):
+    """Opens a table and never answers its first prompt
+
+    Returns:
+        asyncio.StreamWriter: Connection to close once done
+    """
+    reader, writer = await join(host, port, nb_cpus, "idle")
+    while json.loads(await reader.readline())["type"] not in ("bid", "challenge"):
+        pass
+    return writer
+
+
+async def play_client(host, port, nb_cpus, latencies, rng, challenge_p=0.2):
+    """Plays a game with random answers, challenging with probability challenge_p
+    and otherwise placing the smallest raise.
+
+    Args:
+        latencies (list): Receives the seconds between each answer and the next
+            prompt of the table
+    """
+    reader, writer = await join(host, port, nb_cpus, "load")
+    sent = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        msg = json.loads(line)
+        if msg["type"] not in ("bid", "challenge", "end"):
+            continue
+        if sent is not None:
+            latencies.append(time.perf_counter() - sent)
+        if msg["type"] == "end":
+            break
+        if msg["type"] == "challenge":
+            answer = "y" if rng.random() < challenge_p else "n"
+        else:
+            count, value = msg["last"]
+            answer = f"{max(count, 1)} {value + 1}" if value < 6 else f"{count + 1} 6"
+        sent = time.perf_counter()
+        writer.write((answer + "\n").encode())
+    writer.close()
+
+
+async def benchmark(host, port, server_pid, nb_idle, nb_games, concurrency, nb_cpus):
+    """Measures the memory of idle tables, then the latency of tables in play.
+
+    Returns:
+        dict: Results
+    """
+    await wait_server(host, port)
+    res = {}
+
+    if nb_idle:
+        before = rss_kib(server_pid)
+        t0 = time.perf_counter()
+        writers = []
+        for start in range(0, nb_idle, 500):
+            batch = range(start, min(start + 500, nb_idle))
+            writers += await asyncio.gather(
+                *(idle_client(host, port, nb_cpus) for _ in batch)
+            )
+        res["idle_tables"] = nb_idle
+        res["idle_open_seconds"] = time.perf_counter() - t0
+        if before is not None:
+            res["server_kib_per_idle_table"] = (rss_kib(server_pid) - before) / nb_idle
+        for writer in writers:
+            writer.close()
+
+    if nb_games:
+        rng = np.random.default_rng(0)
+        latencies = []
+        sem = asyncio.Semaphore(concurrency)
+
+        async def limited():
+            async with sem:
+                await play_client(host, port, nb_cpus, latencies, rng)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(limited() for _ in range(nb_games)))
+        elapsed = time.perf_counter() - t0
+        ms = np.array(latencies) * 1000
+        res.update(
+            {
+                "games": nb_games,
+                "concurrency": concurrency,
+                "games_per_s": nb_games / elapsed,
+                "actions_per_s": len(ms) / elapsed,
+                "latency_ms": {
+                    f"p{q}": float(np.percentile(ms, q)) for q in (50, 95, 99)
+                },
+            }
+        )
+
+    return res
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load generator for serve.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--connect", action="store_true", help="uses a running server instead of one"
+    )
+    parser.add_argument("--idle", type=int, default=2000, help="idle tables opened")
+    parser.add_argument("--games", type=int, default=2000, help="games played")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--cpus", type=int, default=2)
+    parser.add_argument("--pace", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = None
+    if not args.connect:
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                SERVER_SCRIPT,
+                f"--host={args.host}",
+                f"--port={args.port}",
+                f"--pace={args.pace}",
+                "--timeout=600",
+            ]
+        )
+
+    try:
+        res = asyncio.run(
+            benchmark(
+                args.host,
+                args.port,
+                server.pid if server else None,
+                args.idle if server else 0,
+                args.games,
+                args.concurrency,
+                args.cpus,
+            )
+        )
+    finally:
+        if server:
+            server.terminate()
+
+    print(json.dumps(res, indent=4))
@@ -0,0 +1,155 @@
+import cv2
+import numpy as np
+
+# Pip positions of each value, as fractions of the dice side
+PIPS = {
+    1: [(0.5, 0.5)],
+    2: [(0.25, 0.25), (0.75, 0.75)],
+    3: [(0.25, 0.25), (0.5, 0.5), (0.75, 0.75)],
+    4: [(0.25, 0.25), (0.75, 0.25), (0.25, 0.75), (0.75, 0.75)],
+    5: [(0.25, 0.25), (0.75, 0.25), (0.25, 0.75), (0.75, 0.75), (0.5, 0.5)],
+    6: [
+        (0.25, 0.25),
+        (0.75, 0.25),
+        (0.25, 0.5),
+        (0.75, 0.5),
+        (0.25, 0.75),
+        (0.75, 0.75),
+    ],
+}
+
+
+def render_frame(
+    shape=(480, 640),
+    nb_dices=6,
+    seed=0,
+    dice_size=None,
+    max_rotation=45.0,
+    gradient=0.4,
+    noise=4.0,
+    background=40,
+    dice_color=230,
+    brightness=1.0,
+    table_seed=None,
+):
+    """Renders a synthetic frame of white dices with black pips on a dark table.
+    The dices are placed on a grid with random jitter so that they never touch
+    each other or the frame border.
+
+    Args:
+        shape (tupple(int), optional): Frame size (height, width).
+            Defaults to (480, 640).
+        nb_dices (int, optional): Number of dices. Defaults to 6.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+        dice_size (int, optional): Side of the dices in pixels. Defaults to a
+            twelfth of the frame height.
+        max_rotation (float, optional): Largest rotation of a dice in degrees.
+            Defaults to 45.0.
+        gradient (float, optional): Relative darkening of the lighting from one
+            side of the frame to the other, in a random direction. Defaults to 0.4.
+        noise (float, optional): Standard deviation of the gaussian noise.
+            Defaults to 4.0.
+        background (int, optional): Gray level of the table. Defaults to 40.
+        dice_color (int, optional): Gray level of the dices. Defaults to 230.
+        brightness (float, optional): Gain of the lighting. Defaults to 1.0.
+        table_seed (int, optional): Seed of the lighting direction, so that frames
+            of different dices share the same table. Defaults to seed.
+
+    Returns:
+        tuple(ndarray, list[dict]): BGR frame, and center (row, col), size and
+            value of each dice
+    """
+    rng = np.random.default_rng(seed)
+    h, w = shape
+    size = dice_size or h // 12
+
+    # grid cells large enough for a dice at any rotation
+    cell = int(np.ceil(size * np.sqrt(2))) + 4
+    rows, cols = (h - 2) // cell, (w - 2) // cell
+    if rows * cols < nb_dices:
+        raise ValueError(f"{nb_dices} dices of {size}px don't fit in a {shape} frame")
+
+    gray = np.full(shape, background, dtype=np.float32)
+    truth = []
+    for c in rng.choice(rows * cols, nb_dices, replace=False):
+        value = int(rng.integers(1, 7))
+        angle = np.deg2rad(rng.uniform(-max_rotation, max_rotation))
+        reach = size * (abs(np.cos(angle)) + abs(np.sin(angle))) / 2
+        slack = cell / 2 - reach - 2
+        cy = 1 + (c // cols) * cell + cell / 2 + rng.uniform(-slack, slack)
+        cx = 1 + (c % cols) * cell + cell / 2 + rng.uniform(-slack, slack)
+
+        rot = np.array(
+            [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+        )
+
+        def to_frame(u, v):
+            # (u, v) in [0, 1] across the dice's (x, y) sides
+            return rot @ ((np.array([u, v]) - 0.5) * size) + (cx, cy)
+
+        corners = np.array(
+            [to_frame(u, v) for u, v in [(0, 0), (1, 0), (1, 1), (0, 1)]]
+        )
+        cv2.fillConvexPoly(
+            gray, np.round(corners * 16).astype(np.int32), dice_color, cv2.LINE_AA, 4
+        )
+        for u, v in PIPS[value]:
+            x, y = to_frame(u, v)
+            cv2.circle(
+                gray,
+                (int(round(x * 16)), int(round(y * 16))),
+                max(2, size // 12) * 16,
+                background / 2,
+                -1,
+                cv2.LINE_AA,
+                4,
+            )
+
+        truth.append({"center": (cy, cx), "size": size, "value": value})
+
+    # linear lighting gradient in a random direction
+    table_rng = rng if table_seed is None else np.random.default_rng(table_seed)
+    theta = table_rng.uniform(0, 2 * np.pi)
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    ramp = (xx / w - 0.5) * np.cos(theta) + (yy / h - 0.5) * np.sin(theta)
+    lighting = 1 - gradient * (ramp - ramp.min()) / (ramp.max() - ramp.min())
+    gray *= brightness * lighting
+
+    gray += rng.normal(0, noise, shape).astype(np.float32)
+    gray = np.clip(np.rint(gray), 0, 255).astype(np.uint8)
+
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR), truth
+
+
+def score_detections(obj_lst, truth):
+    """Matches detected dices to the ground truth by center distance, a detection
+    matching a dice if its center lies within half the dice side.
+
+    Args:
+        obj_lst (list[Dice]): Detected dices
+        truth (list[dict]): Ground truth, as returned by render_frame
+
+    Returns:
+        dict: Number of dices, detections, matches and matches with the right value
+    """
+    matched, correct = 0, 0
+    used = set()
+    for t in truth:
+        best, best_dist = None, t["size"] / 2
+        for i, obj in enumerate(obj_lst):
+            dist = np.hypot(
+                obj.center[0] - t["center"][0], obj.center[1] - t["center"][1]
+            )
+            if i not in used and dist < best_dist:
+                best, best_dist = i, dist
+        if best is not None:
+            used.add(best)
+            matched += 1
+            correct += obj_lst[best].value == t["value"]
+
+    return {
+        "dices": len(truth),
+        "detections": len(obj_lst),
+        "matched": matched,
+        "correct": int(correct),
+    }
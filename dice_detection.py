@@ -1,88 +1,128 @@
-import cv2
+import argparse
+import os
 
-from skimage.color import label2rgb
+import cv2
 
-from src.camera_utils import select_camera
+from src.background import BackgroundDetector
+from src.camera_utils import CAMERA_CACHE, select_camera
 from src.ip import *
+from src.pipeline import FramePipeline
+from src.profiling import PROFILER, run_cprofile, stage, timed
+
+# Segmentation backend, see src.ip.segment_frame
+BACKEND = "opencv"
+
+# Number of frames of the empty table averaged by the background calibration
+CALIBRATION_FRAMES = 30
+
+# Background model segmenting the frames instead of the backend, see --background
+background = None
+
+overlay_renderer = OverlayRenderer()
+label_colorizer = LabelColorizer()
+mosaic = MosaicCompositor(layout=(2, 3))
+
+
+@timed("detect")
+def detect(frame):
+    """Runs the detection pipeline on a frame, keeping every intermediate stage.
+
+    Args:
+        frame (ndarray): Current frame
+
+    Returns:
+        tuple: grayscale, normalized, binary and label images, and DetectionResult
+    """
+    if background is not None:
+        gray, norm, bin, label_image, regions = background.segment(frame)
+    else:
+        gray, norm, bin, label_image, regions = segment_frame(frame, BACKEND)
+
+    regions = [r for r in regions if r.area >= min_dice_area(frame.shape)]
+    values = count_pips(label_image, regions)
+
+    obj_lst = DetectionResult.from_regions(regions, values)
+
+    return gray, norm, bin, label_image, obj_lst
+
+
+def debug_view(frame, stages):
+    """Assembles every intermediate stage of the detection on a big image. Runs on
+    the display thread, which owns the display buffers.
+
+    Args:
+        frame (ndarray): Current frame
+        stages (tuple): Intermediate stages, as returned by detect
+
+    Returns:
+        ndarray: Debug display
+    """
+    gray, norm, bin, label_image, obj_lst = stages
+
+    with stage("display.labels"):
+        labels_disp = label_colorizer.render(frame, label_image)
+    overlay = overlay_renderer.render(frame, obj_lst)
+    with stage("display.mosaic"):
+        image = mosaic.compose([frame, gray, norm, bin, labels_disp, overlay])
+
+    if PROFILER.enabled:
+        PROFILER.draw(image)
+
+    return image
+
 
 if __name__ == "__main__":
 
-    camera = select_camera()
+    parser = argparse.ArgumentParser(description="Live dice detection")
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="times the detection stages, shows their latencies on the display "
+        "and dumps them every 5s to a .json or .csv file",
+    )
+    parser.add_argument("--cprofile", metavar="PATH", help="writes cProfile stats")
+    parser.add_argument(
+        "--select-camera",
+        action="store_true",
+        help="asks for the camera even if the last one selected still works",
+    )
+    parser.add_argument(
+        "--background",
+        metavar="PATH",
+        help="segments the dices against a model of the empty table, calibrated "
+        "and saved to PATH on the first run",
+    )
+    parser.add_argument(
+        "--calibrate", action="store_true", help="recalibrates the background"
+    )
+    args = parser.parse_args()
+
+    camera, cap = select_camera(None if args.select_camera else CAMERA_CACHE)
     cv2.destroyAllWindows()  # Necessary otherwise the window for camera selection don't go away
 
-    cap = cv2.VideoCapture(camera)
-
-    while True:
-
-        ret, frame = cap.read()
-
-        gray = rgb2gray_uint8(frame)
-
-        norm = normalize_uint8(gray)
-
-        bin = otsu_uint8(norm)
-
-        cleared = clear_border(bin)
-
-        label_image = label(cleared)
-
-        # # Drastically reduces framerate
-        # image_label_overlay = label2rgb(
-        #     label_image, image=frame, bg_label=0
-        # )
-        # cv2.imshow("Labels", image_label_overlay)
-
-        obj_lst = []
-        for region in regionprops(label_image):
-            if region.area >= 100:
-                obj_lst.append(
-                    Dice(
-                        in_img=frame,
-                        center=region.centroid,
-                        bbox=region.bbox,
-                        value=None,
-                    )
-                )
-
-        overlay = dices_bboxes_overlay(frame, obj_lst)
-
-        # Display everything on a big image
-        gray_disp = np.stack(
-            [
-                gray,
-            ]
-            * 3,
-            axis=2,
-        )
-        cleared_disp = np.stack(
-            [
-                cleared,
-            ]
-            * 3,
-            axis=2,
-        )
-        norm_disp = np.stack(
-            [
-                norm,
-            ]
-            * 3,
-            axis=2,
-        )
-        bin_disp = np.stack(
-            [
-                bin,
-            ]
-            * 3,
-            axis=2,
-        )
-
-        row1 = np.concatenate([frame, gray_disp, norm_disp], axis=1)
-        row2 = np.concatenate([bin_disp, cleared_disp, overlay], axis=1)
-        display = np.concatenate([row1, row2], axis=0)
-        cv2.imshow("", display)
-
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+    if args.background:
+        background = BackgroundDetector()
+        if os.path.exists(args.background) and not args.calibrate:
+            background.load(args.background)
+        else:
+            input("\nClear the table and press enter to calibrate the background...")
+            background.calibrate(cap.read()[1] for _ in range(CALIBRATION_FRAMES))
+            background.save(args.background)
+
+    if args.profile:
+        PROFILER.enable()
+        PROFILER.dump_every(args.profile)
+
+    # Capture, processing and display run on separate threads
+    pipeline = FramePipeline(cap, process=detect, render=debug_view)
+    if args.cprofile:
+        # Profiles the display and the capture and detection threads
+        run_cprofile(pipeline.run, args.cprofile, threads=True)
+    else:
+        pipeline.run()
+
+    if args.profile:
+        PROFILER.dump(args.profile)
 
     cap.release()
     cv2.destroyAllWindows()
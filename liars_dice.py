@@ -1,8 +1,18 @@
+import argparse
+
 from src.gameplay import ask_player_name, ask_nb_cpus, Game
+from src.profiling import PROFILER, run_cprofile
 
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Liar's dice against the computer")
+    parser.add_argument(
+        "--profile", metavar="PATH", help="dumps round latencies to a .json/.csv file"
+    )
+    parser.add_argument("--cprofile", metavar="PATH", help="writes cProfile stats")
+    args = parser.parse_args()
+
     # player_name = ask_player_name()
     player_name = "Player"
 
@@ -12,4 +22,12 @@ if __name__ == "__main__":
     nb_dices = 3
 
     game = Game(player_name, nb_cpus, nb_dices)
-    game.play()
+
+    if args.profile:
+        PROFILER.enable()
+    if args.cprofile:
+        run_cprofile(game.play, args.cprofile)
+    else:
+        game.play()
+    if args.profile:
+        PROFILER.dump(args.profile)
@@ -0,0 +1,83 @@
+import argparse
+import time
+
+import numpy as np
+
+from src import eventlog
+from src.gameplay import CpuPlayer, Game
+
+
+def record_games(path, nb_games, nb_cpus, nb_dices, seed=0):
+    """Plays headless games of CpuPlayers and logs them.
+
+    Args:
+        path (str): Log file
+        nb_games (int): Number of games
+        nb_cpus (int): Number of players besides the human player's seat
+        nb_dices (int): Initial number of dices for each player
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+    """
+    rng = np.random.default_rng(seed)
+    with eventlog.EventLogWriter(path) as log:
+        for _ in range(nb_games):
+            seat = CpuPlayer(name="seat0", nb_dices=nb_dices, headless=True, rng=rng)
+            game = Game(
+                None,
+                nb_cpus,
+                nb_dices,
+                headless=True,
+                human_player=seat,
+                rng=rng,
+                event_log=log,
+            )
+            game.play(until_last_standing=True)
+
+
+def summarize(path):
+    """Aggregates a log chunk by chunk.
+
+    Args:
+        path (str): Log file
+
+    Returns:
+        dict: Number of events, games, rounds, bids and won challenges
+    """
+    counts = np.zeros(len(eventlog.KIND_NAMES), dtype=np.int64)
+    challenges_won = 0
+    for chunk in eventlog.iter_chunks(path):
+        counts += np.bincount(chunk["kind"], minlength=len(counts))
+        reveals = chunk[chunk["kind"] == eventlog.REVEAL]
+        challenges_won += int(np.count_nonzero(reveals["arg"] != reveals["code"] // 6))
+
+    return {
+        "events": int(counts.sum()),
+        "games": int(counts[eventlog.START]),
+        "rounds": int(counts[eventlog.REVEAL]),
+        "bids": int(counts[eventlog.BID]),
+        "challenges_won": challenges_won,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Records, replays and summarizes logs")
+    parser.add_argument("log", help="event log file")
+    parser.add_argument("--record", type=int, metavar="GAMES", help="games to log")
+    parser.add_argument("--cpus", type=int, default=4)
+    parser.add_argument("--dices", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--game", type=int, help="id of a game to replay")
+    args = parser.parse_args()
+
+    if args.record:
+        t0 = time.perf_counter()
+        record_games(args.log, args.record, args.cpus, args.dices, args.seed)
+        print(f"Logged {args.record} games in {time.perf_counter() - t0:.2f}s")
+
+    if args.game is not None:
+        for line in eventlog.replay(eventlog.find_game(args.log, args.game)):
+            print(line)
+    else:
+        t0 = time.perf_counter()
+        summary = summarize(args.log)
+        print(summary, f"in {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+
+from src import gameplay
+from src.server import GameServer
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Hosts games over TCP, one table per connection"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dices", type=int, default=3)
+    parser.add_argument("--max-cpus", type=int, default=4)
+    parser.add_argument("--cpu", default="ProbabilisticCpuPlayer")
+    parser.add_argument("--pace", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = GameServer(
+        nb_dices=args.dices,
+        max_cpus=args.max_cpus,
+        cpu_player_cls=getattr(gameplay, args.cpu),
+        pace=args.pace,
+        action_timeout=args.timeout,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
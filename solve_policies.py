@@ -0,0 +1,42 @@
+import argparse
+import os
+import time
+
+from src.solver import save_policies, solve_tables, table_configs
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Solves the bidding rounds of small tables for SolverCpuPlayer. "
+        "Tables with more joint rolls than --max-rolls are skipped and played by "
+        "the ProbabilisticCpuPlayer instead: with the default, every table is "
+        "solved for up to 2 players of 4 dices, 3 players of 2 dices or 4 players "
+        "of 1 dice."
+    )
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--dices", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument(
+        "--max-rolls",
+        type=int,
+        default=50000,
+        help="largest number of joint rolls of a table solved",
+    )
+    parser.add_argument("--output", default="policy.bin")
+    args = parser.parse_args()
+
+    configs = table_configs(args.players, args.dices)
+    t0 = time.perf_counter()
+    policies = solve_tables(configs, args.iterations, args.max_rolls)
+    save_policies(args.output, policies)
+
+    skipped = [dices for dices in configs if dices not in policies]
+    if skipped:
+        print(
+            f"Skipped {len(skipped)} tables with more than {args.max_rolls} joint "
+            f"rolls: {', '.join(map(str, skipped))}"
+        )
+    print(
+        f"Solved {len(policies)} tables in {time.perf_counter() - t0:.1f}s, "
+        f"{os.path.getsize(args.output) / 1024:.0f} KiB written to {args.output}"
+    )
@@ -0,0 +1,239 @@
+import cv2
+import numpy as np
+
+from src.ip import DetectionResult, count_pips, label_cleared_cv, min_dice_area
+from src.profiling import stage, timed
+
+
+class BackgroundDetector:
+    def __init__(
+        self,
+        threshold=30,
+        update_rate=0.01,
+        update_interval=10,
+        max_dice_area_ratio=0.05,
+        lighting_step=16,
+        roi_scale=4,
+    ):
+        """Dice detection for a camera fixed over the table, segmenting the dices
+        against a model of the empty table instead of thresholding every frame.
+
+        The model is the running average of calibration frames of the empty table.
+        A pixel is foreground when it is brighter than the model by more than the
+        threshold, after compensating the global lighting shift, estimated as the
+        median difference on a sparse grid of pixels. Dark objects and shadows are
+        thus ignored, and the pips, darker than the dices, are left as holes for
+        count_pips. The model keeps learning slowly from the background pixels.
+
+        The dices are located on the foreground mask downscaled by roi_scale, and
+        only their surroundings are labelled at full resolution, labelling the full
+        frame being the most expensive stage of the Otsu chain.
+
+        Args:
+            threshold (int, optional): Gray level above the model for a pixel to be
+                foreground. Defaults to 30.
+            update_rate (float, optional): Weight of the new frame in the running
+                average of the background pixels. Defaults to 0.01.
+            update_interval (int, optional): Number of frames between two updates
+                of the model. Defaults to 10.
+            max_dice_area_ratio (float, optional): Largest area of a dice, as a
+                fraction of the frame area, larger regions such as hands being
+                discarded. Defaults to 0.05.
+            lighting_step (int, optional): Spacing in pixels of the grid the
+                lighting shift is estimated on. Defaults to 16.
+            roi_scale (int, optional): Downscaling factor of the foreground mask
+                the dices are located on. Defaults to 4.
+        """
+        self.threshold = threshold
+        self.update_rate = update_rate
+        self.update_interval = update_interval
+        self.max_dice_area_ratio = max_dice_area_ratio
+        self.lighting_step = lighting_step
+        self.roi_scale = roi_scale
+
+        self.model = None  # running average, float32
+        self.background = None  # model as uint8
+        self.nb_calibration_frames = 0
+        self.frames_since_update = 0
+
+    @property
+    def calibrated(self):
+        return self.model is not None
+
+    def calibrate(self, frames):
+        """Learns the empty table, averaging frames with no dices on it. Can be
+        called again with more frames to refine the model.
+
+        Args:
+            frames (iterable[ndarray]): Frames of the empty table
+        """
+        for frame in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if self.model is None or self.model.shape != gray.shape:
+                self.model = gray.astype(np.float32)
+                self.nb_calibration_frames = 1
+            else:
+                self.nb_calibration_frames += 1
+                cv2.accumulateWeighted(gray, self.model, 1 / self.nb_calibration_frames)
+        self.background = cv2.convertScaleAbs(self.model)
+
+    def save(self, path):
+        """Saves the model, to be reused between sessions with load.
+
+        Args:
+            path (str): Output file, in the .npz format
+        """
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                model=self.model,
+                nb_calibration_frames=self.nb_calibration_frames,
+                threshold=self.threshold,
+            )
+
+    def load(self, path):
+        """Loads a model saved with save.
+
+        Args:
+            path (str): Model file
+        """
+        with np.load(path) as data:
+            self.model = data["model"].astype(np.float32)
+            self.nb_calibration_frames = int(data["nb_calibration_frames"])
+            self.threshold = int(data["threshold"])
+        self.background = cv2.convertScaleAbs(self.model)
+
+    def lighting_shift(self, gray):
+        """Returns:
+        int: Median difference between the frame and the model, on a sparse grid
+        """
+        step = self.lighting_step
+        diff = gray[::step, ::step].astype(np.int16) - self.background[::step, ::step]
+        return int(np.median(diff))
+
+    def update(self, gray, foreground):
+        """Blends the background pixels of a frame into the model.
+
+        Args:
+            gray (ndarray): Grayscale frame
+            foreground (ndarray): Foreground mask of the frame
+        """
+        self.frames_since_update += 1
+        if self.frames_since_update < self.update_interval:
+            return
+        self.frames_since_update = 0
+
+        # Keeps the surroundings of the dices out of the model as well
+        mask = cv2.dilate(foreground, np.ones((15, 15), dtype=np.uint8))
+        cv2.bitwise_not(mask, dst=mask)
+        cv2.accumulateWeighted(gray, self.model, self.update_rate, mask=mask)
+        cv2.convertScaleAbs(self.model, dst=self.background)
+
+    def foreground(self, frame):
+        """Thresholds the difference between a frame and the model, then updates
+        the model.
+
+        Args:
+            frame (ndarray): Current frame
+
+        Returns:
+            tuple(ndarray): grayscale, difference and foreground images
+        """
+        if self.model is None:
+            raise RuntimeError("The background model must be calibrated first")
+
+        with stage("ip.rgb2gray"):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray.shape != self.background.shape:
+            raise ValueError(
+                f"Frame of shape {gray.shape} doesn't match the background model "
+                f"of shape {self.background.shape}"
+            )
+
+        with stage("ip.threshold"):
+            shift = self.lighting_shift(gray)
+            diff = cv2.subtract(gray, cv2.add(self.background, shift))
+            _, foreground = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        with stage("ip.background_update"):
+            self.update(gray, foreground)
+
+        return gray, diff, foreground
+
+    def dice_area_range(self, frame_shape):
+        """Returns:
+        tupple(float): Smallest and largest area of a dice
+        """
+        max_area = self.max_dice_area_ratio * frame_shape[0] * frame_shape[1]
+        return min_dice_area(frame_shape), max_area
+
+    def segment(self, frame):
+        """Segments the dices of a frame against the model, labelling the full
+        foreground mask, see segment_frame. Used for display, detect being faster.
+
+        Args:
+            frame (ndarray): Current frame
+
+        Returns:
+            tuple: grayscale, difference and foreground images, label image and
+                list of regions
+        """
+        gray, diff, foreground = self.foreground(frame)
+        with stage("ip.label"):
+            label_image, regions = label_cleared_cv(foreground)
+        min_area, max_area = self.dice_area_range(frame.shape)
+        regions = [r for r in regions if min_area <= r.area <= max_area]
+
+        return gray, diff, foreground, label_image, regions
+
+    @timed("ip.BackgroundDetector.detect")
+    def detect(self, frame):
+        """Detects the dices on the current frame.
+
+        Args:
+            frame (ndarray): Current frame
+
+        Returns:
+            DetectionResult: Dices found on the frame
+        """
+        _, _, foreground = self.foreground(frame)
+        h, w = foreground.shape
+        s = self.roi_scale
+        min_area, max_area = self.dice_area_range(foreground.shape)
+
+        with stage("ip.label"):
+            small = cv2.resize(
+                foreground, (w // s, h // s), interpolation=cv2.INTER_NEAREST
+            )
+            n, _, stats, _ = cv2.connectedComponentsWithStats(
+                small, connectivity=8, ltype=cv2.CV_32S
+            )
+
+        bboxes, centers, areas, values = [], [], [], []
+        for x, y, bw, bh, area in stats[1:]:
+            # Skips speckles and hands before labelling at full resolution, the
+            # downscaled areas being approximate
+            if not min_area / 2 <= area * s * s <= 2 * max_area:
+                continue
+            # Margin of 2 downscaled pixels so that the dices don't touch the border
+            # of their crop
+            top, left = max(0, (y - 2) * s), max(0, (x - 2) * s)
+            bottom, right = min(h, (y + bh + 2) * s), min(w, (x + bw + 2) * s)
+            crop_labels, crop_regions = label_cleared_cv(
+                foreground[top:bottom, left:right]
+            )
+            for r in crop_regions:
+                if not min_area <= r.area <= max_area:
+                    continue
+                bboxes.append(
+                    (
+                        r.bbox[0] + top,
+                        r.bbox[1] + left,
+                        r.bbox[2] + top,
+                        r.bbox[3] + left,
+                    )
+                )
+                centers.append((r.centroid[0] + top, r.centroid[1] + left))
+                areas.append(r.area)
+                values.append(count_pips(crop_labels, [r])[0])
+
+        return DetectionResult.from_lists(bboxes, centers, areas, values)
@@ -0,0 +1,217 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from src.ip import detect_dices
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# Name, dtype and number of values per row of each output column
+COLUMNS = (
+    ("frame", np.int32, 1),
+    ("bbox", np.int32, 4),
+    ("center", np.float32, 2),
+    ("value", np.int8, 1),
+)
+
+
+def iter_source(source, chunk_size):
+    """Streams the frames of a video file, or the paths of the images of a
+    directory, in chunks.
+
+    Image paths are yielded rather than decoded images so that the workers do the
+    decoding and no pixels have to be sent to them.
+
+    Args:
+        source (str): Path to a video file or to a directory of images
+        chunk_size (int): Number of frames per chunk
+
+    Yields:
+        tuple(int, list): Index of the first frame of the chunk and its frames or paths
+    """
+    if os.path.isdir(source):
+        paths = sorted(
+            os.path.join(source, f)
+            for f in os.listdir(source)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        for start in range(0, len(paths), chunk_size):
+            yield start, paths[start : start + chunk_size]
+        return
+
+    cap = cv2.VideoCapture(source)
+    assert cap.isOpened(), f"ERROR: could not open {source}"
+    start, chunk = 0, []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        chunk.append(frame)
+        if len(chunk) == chunk_size:
+            yield start, chunk
+            start, chunk = start + chunk_size, []
+    cap.release()
+    if chunk:
+        yield start, chunk
+
+
+def detect_chunk(start, frames, backend):
+    """Runs the detection on a chunk of frames. Executed in the worker processes.
+
+    Args:
+        start (int): Index of the first frame of the chunk
+        frames (list): Frames, or paths of images to read
+        backend (str): Segmentation backend, see src.ip.segment_frame
+
+    Returns:
+        dict: Columns of the detections of the chunk, one row per dice, and the
+            paths of the images that could not be read under "skipped"
+    """
+    parts = {name: [] for name, _, _ in COLUMNS}
+    skipped = []
+    for i, frame in enumerate(frames):
+        if isinstance(frame, str):
+            path, frame = frame, cv2.imread(frame)
+            if frame is None:
+                skipped.append(path)
+                continue
+        res = detect_dices(frame, backend)
+        parts["frame"].append(np.full(len(res), start + i))
+        parts["bbox"].append(res.bboxes)
+        parts["center"].append(res.centroids)
+        parts["value"].append(res.values)
+
+    columns = {
+        name: np.concatenate(parts[name] or [[]]).astype(dtype).reshape(-1, width)
+        for name, dtype, width in COLUMNS
+    }
+    columns["skipped"] = skipped
+    return columns
+
+
+class ColumnWriter:
+    def __init__(self, path):
+        """Appends detections to a directory holding one raw binary file per column
+        and a json file describing them.
+
+        Args:
+            path (str): Output directory
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.files = {
+            name: open(os.path.join(path, f"{name}.bin"), "wb")
+            for name, _, _ in COLUMNS
+        }
+        self.nb_rows = 0
+        self.skipped = []
+
+    def write(self, columns):
+        """Appends the rows of a chunk.
+
+        Args:
+            columns (dict): Columns, as returned by detect_chunk
+        """
+        for name, f in self.files.items():
+            f.write(columns[name].tobytes())
+        self.nb_rows += len(columns["frame"])
+        self.skipped.extend(columns["skipped"])
+
+    def close(self, nb_frames):
+        """Flushes the columns and writes the description file.
+
+        Args:
+            nb_frames (int): Number of frames processed
+        """
+        for f in self.files.values():
+            f.close()
+        meta = {
+            "nb_rows": self.nb_rows,
+            "nb_frames": nb_frames,
+            "skipped": self.skipped,
+            "columns": {
+                name: {"dtype": np.dtype(dtype).str, "width": width}
+                for name, dtype, width in COLUMNS
+            },
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=4)
+
+
+def load_batch_results(path):
+    """Memory-maps the columns written by detect_dices_batch.
+
+    Args:
+        path (str): Output directory of detect_dices_batch
+
+    Returns:
+        dict[str, ndarray]: Columns, each with one row per detected dice
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+
+    columns = {}
+    for name, desc in meta["columns"].items():
+        shape = (meta["nb_rows"], desc["width"])
+        if meta["nb_rows"] == 0:
+            columns[name] = np.empty(shape, dtype=desc["dtype"])
+        else:
+            columns[name] = np.memmap(
+                os.path.join(path, f"{name}.bin"),
+                dtype=desc["dtype"],
+                mode="r",
+                shape=shape,
+            )
+
+    return columns
+
+
+def detect_dices_batch(
+    source, output, workers=None, chunk_size=32, backend="opencv", max_pending=None
+):
+    """Runs the dice detection on every frame of a video file or image directory
+    with a pool of processes, and writes the detections to a columnar output.
+
+    Images that can't be read are skipped, their frame index being left without
+    detections, and listed in the description file.
+
+    Chunks are submitted while at most max_pending of them are in flight and their
+    results are written in frame order, so memory stays bounded whatever the
+    length of the source.
+
+    Args:
+        source (str): Path to a video file or to a directory of images
+        output (str): Output directory, see load_batch_results
+        workers (int, optional): Number of processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): Number of frames per task. Defaults to 32.
+        backend (str, optional): Segmentation backend. Defaults to "opencv".
+        max_pending (int, optional): Maximum number of chunks in flight. Defaults
+            to twice the number of workers.
+
+    Returns:
+        tuple(int, int, list[str]): Number of frames processed and of dices
+            detected, and paths of the images skipped
+    """
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or 2 * workers
+
+    writer = ColumnWriter(output)
+    pending = deque()
+    nb_frames = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for start, frames in iter_source(source, chunk_size):
+            if len(pending) >= max_pending:
+                writer.write(pending.popleft().result())
+            pending.append(executor.submit(detect_chunk, start, frames, backend))
+            nb_frames += len(frames)
+
+        while pending:
+            writer.write(pending.popleft().result())
+
+    writer.close(nb_frames)
+
+    return nb_frames, writer.nb_rows, writer.skipped
@@ -1,54 +1,140 @@
+import json
+import threading
+import time
+
 import cv2
 
+CAMERA_CACHE = ".camera_cache.json"
+
+
+def probe_cameras(ports=range(5), timeout=2.0):
+    """Opens the cameras of several ports concurrently, each one on its own thread,
+    and keeps those reading a frame before the timeout. A port still opening at the
+    timeout is abandoned, its thread releasing the camera once it returns.
+
+    Args:
+        ports (iterable[int], optional): Ports to probe. Defaults to range(5).
+        timeout (float, optional): Seconds given to the ports to open and read a
+            frame. Defaults to 2.0.
 
-def check_cameras(max_cameras_to_check=5):
+    Returns:
+        dict[int, tupple(cv2.VideoCapture, ndarray)]: Opened camera and first
+            frame of each working port
+    """
+    results = {}
+    lock = threading.Lock()
+    abandoned = threading.Event()
+
+    def probe(i):
+        cap = cv2.VideoCapture(i)
+        is_reading, frame = cap.read() if cap.isOpened() else (False, None)
+        with lock:
+            if is_reading and not abandoned.is_set():
+                results[i] = (cap, frame)
+                return
+        cap.release()
+
+    threads = [threading.Thread(target=probe, args=(i,), daemon=True) for i in ports]
+    deadline = time.perf_counter() + timeout
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(max(deadline - time.perf_counter(), 0.0))
+    with lock:
+        abandoned.set()
+        return dict(sorted(results.items()))
+
+
+def check_cameras(max_cameras_to_check=5, timeout=2.0):
     """Checks available cameras
 
     Args:
         max_cameras_to_check (int, optional): Maximun number of ports to check. Defaults to 5.
+        timeout (float, optional): Seconds given to the ports, see probe_cameras.
+            Defaults to 2.0.
 
     Returns:
         list[int]: Indices of available cameras
     """
-    print("\nLooking for available cameras...")
-    available_cameras = []
-    for i in range(max_cameras_to_check):
-        print(f"Checking port {i}...")
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            is_reading, _ = cap.read()
-            w = cap.get(3)
-            h = cap.get(4)
-            if is_reading:
-                print(
-                    f"Port {i} is working and reads images with resolution of ({h} x {w})"
-                )
-                available_cameras.append(i)
+    cameras = probe_cameras(range(max_cameras_to_check), timeout)
+    for cap, _ in cameras.values():
         cap.release()
-    return available_cameras
+    return list(cameras)
 
 
-def select_camera():
-    """Asks the user which camera they want to use. When a camera index is chosen, displays
-    the corresponding feed and ask for confirmation.
+def load_camera_cache(path=CAMERA_CACHE):
+    """Returns:
+    dict: Index and resolution of the camera selected last, None if not cached
+    """
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+        return {"index": int(cache["index"]), "resolution": list(cache["resolution"])}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_camera_cache(index, resolution, path=CAMERA_CACHE):
+    """Saves the selected camera, see load_camera_cache.
+
+    Args:
+        index (int): Camera index
+        resolution (tupple(int)): Resolution of its frames (height, width)
+        path (str, optional): Cache file. Defaults to CAMERA_CACHE.
+    """
+    with open(path, "w") as f:
+        json.dump({"index": index, "resolution": list(resolution)}, f)
+
+
+def select_camera(cache_path=CAMERA_CACHE, max_cameras_to_check=5, timeout=2.0):
+    """Opens the camera selected last if it still reads frames of the same
+    resolution. Otherwise, asks the user which camera they want to use: when a
+    camera index is chosen, displays the corresponding feed and ask for confirmation.
+    The selected camera is saved to the cache.
+
+    Args:
+        cache_path (str, optional): Cache file, None to always ask the user.
+            Defaults to CAMERA_CACHE.
+        max_cameras_to_check (int, optional): Maximun number of ports to check.
+            Defaults to 5.
+        timeout (float, optional): Seconds given to the ports, see probe_cameras.
+            Defaults to 2.0.
 
     Returns:
-        int: Selected camera index
+        tupple(int, cv2.VideoCapture): Selected camera index and opened camera
     """
-    available_cameras = check_cameras()
-    assert available_cameras, "ERROR: no camera available"
+    t0 = time.perf_counter()
+    cache = load_camera_cache(cache_path) if cache_path else None
+    if cache is not None:
+        cameras = probe_cameras([cache["index"]], timeout)
+        if cache["index"] in cameras:
+            cap, frame = cameras[cache["index"]]
+            if list(frame.shape[:2]) == cache["resolution"]:
+                print(
+                    f"\nUsing cached camera #{cache['index']} "
+                    f"(opened in {time.perf_counter() - t0:.2f}s)"
+                )
+                return cache["index"], cap
+            cap.release()
 
-    print("\nAvailable cameras: ", available_cameras)
+    print("\nLooking for available cameras...")
+    cameras = probe_cameras(range(max_cameras_to_check), timeout)
+    assert cameras, "ERROR: no camera available"
+    for i, (_, frame) in cameras.items():
+        h, w = frame.shape[:2]
+        print(f"Port {i} is working and reads images with resolution of ({h} x {w})")
+    print(f"Probed {max_cameras_to_check} ports in {time.perf_counter() - t0:.2f}s")
+
+    print("\nAvailable cameras: ", list(cameras))
     selected_camera = None
     while True:
         selected_camera = int(
             input("\nEnter the index of the camera you want to use:    ")
         )
-        if selected_camera not in available_cameras:
+        if selected_camera not in cameras:
             print("Invalid selection. Please select from available cameras.")
         else:
-            cap = cv2.VideoCapture(selected_camera)
-            ret, frame = cap.read()
+            cap, frame = cameras[selected_camera]
             cv2.imshow("Webcam Feed", frame)
             cv2.waitKey(100)
 
@@ -57,7 +143,12 @@ def select_camera():
                 print(f"\nSelected camera #{selected_camera}")
                 break
 
-            cap.release()
             cv2.destroyAllWindows()
 
-    return selected_camera
+    for i, (other, _) in cameras.items():
+        if i != selected_camera:
+            other.release()
+    if cache_path:
+        save_camera_cache(selected_camera, frame.shape[:2], cache_path)
+
+    return selected_camera, cap
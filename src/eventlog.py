@@ -0,0 +1,248 @@
+import numpy as np
+
+MAGIC = b"LDEVENTS"
+VERSION = 1
+
+# Kinds of events
+START, ROLL, BID, CHALLENGE, REVEAL, LOSS, END = range(7)
+KIND_NAMES = ("start", "roll", "bid", "challenge", "reveal", "loss", "end")
+
+# Fixed-width record of an event. The meaning of player, code and arg depends on
+# the kind:
+#   START      player: number of players, arg: initial number of dices each
+#   ROLL       player: id, dices: number of dices showing each value 1 to 6
+#   BID        player: id, code: Bid.code
+#   CHALLENGE  player: challenger id, code: Bid.code, arg: bidder id
+#   REVEAL     code: Bid.code, arg: number of dices showing the bid's value
+#   LOSS       player: looser id, arg: number of dices left
+#   END        player: winner id, NO_PLAYER if the human player's seat lost
+RECORD = np.dtype(
+    [
+        ("game", "<u4"),
+        ("round", "<u2"),
+        ("kind", "u1"),
+        ("player", "u1"),
+        ("code", "<i2"),
+        ("arg", "<i2"),
+        ("dices", "u1", (6,)),
+    ]
+)
+NO_PLAYER = 255
+NO_DICES = (0,) * 6
+
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("record_size", "<u4")])
+
+
+class EventLogWriter:
+    def __init__(self, path, buffer_size=65536, append=False):
+        """Streams events to a binary log. Events are buffered as tuples and
+        written in bulk, buffer_size records at a time, as an array of RECORD.
+
+        Args:
+            path (str): Log file
+            buffer_size (int, optional): Number of records written at once.
+                Defaults to 65536.
+            append (bool, optional): Appends to an existing log, game ids
+                following its last game. Defaults to False.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.next_game = 0
+
+        if append:
+            events = read_events(path)
+            if len(events):
+                self.next_game = int(events["game"][-1]) + 1
+            del events
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            header = np.zeros(1, dtype=HEADER)
+            header[0] = (MAGIC, VERSION, RECORD.itemsize)
+            self.file.write(header.tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start_game(self, nb_players, nb_dices):
+        """Logs the start of a new game.
+
+        Args:
+            nb_players (int): Number of players
+            nb_dices (int): Initial number of dices for each player
+
+        Returns:
+            int: Id of the game
+        """
+        game = self.next_game
+        self.next_game += 1
+        self.append(game, 0, START, nb_players, 0, nb_dices)
+        return game
+
+    def append(self, game, round, kind, player=0, code=0, arg=0, dices=NO_DICES):
+        """Adds an event, see RECORD for the meaning of the fields.
+
+        Args:
+            game (int): Id of the game
+            round (int): Round of the game
+            kind (int): Kind of event
+            player (int, optional): Player id. Defaults to 0.
+            code (int, optional): Bid code. Defaults to 0.
+            arg (int, optional): Argument of the event. Defaults to 0.
+            dices (tupple(int), optional): Number of dices showing each value.
+                Defaults to NO_DICES.
+        """
+        self.buffer.append((game, round, kind, player, code, arg, dices))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered events"""
+        if self.buffer:
+            self.file.write(np.array(self.buffer, dtype=RECORD).tobytes())
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        """Flushes the buffered events and closes the file"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def read_events(path):
+    """Memory-maps a log, records are only read when accessed.
+
+    Args:
+        path (str): Log file
+
+    Returns:
+        np.memmap: Array of RECORD
+    """
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) == 0 or header[0]["magic"] != MAGIC:
+        raise ValueError(f"{path} is not an event log")
+    if header[0]["record_size"] != RECORD.itemsize:
+        raise ValueError(f"{path} was written with another record layout")
+
+    nb_bytes = np.memmap(path, dtype=np.uint8, mode="r").size - HEADER.itemsize
+    if nb_bytes < RECORD.itemsize:
+        return np.zeros(0, dtype=RECORD)
+    return np.memmap(
+        path,
+        dtype=RECORD,
+        mode="r",
+        offset=HEADER.itemsize,
+        shape=(nb_bytes // RECORD.itemsize,),
+    )
+
+
+def iter_chunks(path, chunk_size=1 << 20):
+    """Iterates over a log by chunks, without loading it in memory.
+
+    Args:
+        path (str): Log file
+        chunk_size (int, optional): Number of records per chunk. Defaults to 2**20.
+
+    Yields:
+        ndarray: Chunk of records, a view on the mapped file
+    """
+    events = read_events(path)
+    for start in range(0, len(events), chunk_size):
+        yield events[start : start + chunk_size]
+
+
+def iter_games(path, chunk_size=1 << 20):
+    """Iterates over the games of a log, a game starting at each START record.
+
+    Args:
+        path (str): Log file
+        chunk_size (int, optional): Number of records read at once.
+            Defaults to 2**20.
+
+    Yields:
+        ndarray: Records of a game
+    """
+    carry = np.zeros(0, dtype=RECORD)
+    for chunk in iter_chunks(path, chunk_size):
+        starts = np.flatnonzero(chunk["kind"] == START)
+        if len(starts) == 0:
+            carry = np.concatenate([carry, chunk])
+            continue
+        if len(carry) or starts[0] > 0:
+            yield np.concatenate([carry, chunk[: starts[0]]])
+        for a, b in zip(starts, starts[1:]):
+            yield chunk[a:b]
+        carry = np.array(chunk[starts[-1] :])
+    if len(carry):
+        yield carry
+
+
+def find_game(path, game, chunk_size=1 << 20):
+    """Finds the records of a game.
+
+    Args:
+        path (str): Log file
+        game (int): Id of the game
+        chunk_size (int, optional): Number of records read at once.
+            Defaults to 2**20.
+
+    Returns:
+        ndarray: Records of the game, empty if not in the log
+    """
+    parts = [c[c["game"] == game] for c in iter_chunks(path, chunk_size)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD)
+
+
+def describe(event):
+    """Formats an event as the game would print it.
+
+    Args:
+        event (np.void): Record
+
+    Returns:
+        str: Description of the event
+    """
+    kind, player, arg = event["kind"], event["player"], event["arg"]
+    count = int(event["code"]) // 6
+    value = int(event["code"]) % 6 + 1
+
+    if kind == START:
+        return f"Game {event['game']}: {player} players with {arg} dices each"
+    if kind == ROLL:
+        values = np.repeat(np.arange(1, 7), event["dices"])
+        return f"player {player} rolled: {values}"
+    if kind == BID:
+        return f"player {player} bid {count} {value}"
+    if kind == CHALLENGE:
+        return f"player {player} challenged player {arg}'s bid of {count} {value}"
+    if kind == REVEAL:
+        return f"There are {arg} {value}s on the table"
+    if kind == LOSS:
+        return f"player {player} lost a dice and has now {arg} left"
+    if kind == END:
+        if player == NO_PLAYER:
+            return "Game over"
+        return f"player {player} won!"
+    return f"unknown event {kind}"
+
+
+def replay(records):
+    """Replays the events of a game.
+
+    Args:
+        records (ndarray): Records of a game, see iter_games and find_game
+
+    Yields:
+        str: Description of each event, preceded by the round headers
+    """
+    current_round = 0
+    for event in records:
+        if event["round"] != current_round:
+            current_round = event["round"]
+            yield f"---------- Round {current_round} ----------"
+        yield describe(event)
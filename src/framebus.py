@@ -0,0 +1,285 @@
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = b"LDFRAMES"
+
+# Layout of the shared memory: the header, the state of each slot, then the frames
+HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("nb_slots", "<u4"),
+        ("height", "<u4"),
+        ("width", "<u4"),
+        ("channels", "<u4"),
+        ("latest", "<i8"),  # sequence number of the newest frame, -1 if none
+        ("closed", "u1"),  # set by the producer once it stops writing
+    ]
+)
+SLOT = np.dtype(
+    [
+        ("version", "<u8"),  # odd while the frame is being written
+        ("seq", "<i8"),  # sequence number of the frame in the slot
+        ("timestamp", "<f8"),  # time.perf_counter() of the capture
+    ]
+)
+
+# Frames are aligned on 64 bytes
+_ALIGN = 64
+
+# Names of the buses created by this process, registered with its resource tracker
+_created = set()
+
+
+def _frames_offset(nb_slots):
+    size = HEADER.itemsize + nb_slots * SLOT.itemsize
+    return -(-size // _ALIGN) * _ALIGN
+
+
+class FrameBus:
+    def __init__(self, shm, owner):
+        """Ring of frame slots in shared memory, written by a single producer
+        process and read by any number of consumer processes. Use FrameBus.create
+        in the producer and FrameBus.attach in the consumers.
+
+        Frame i is written to slot i % nb_slots. Reads don't take any lock: a
+        slot's version is odd while the producer writes it, and a consumer checks
+        the version and sequence number of its slot to know whether the frame it
+        holds is complete and was not overwritten since. Readers get NumPy views on
+        the slots, without copying the frames. A view stays valid until the
+        producer laps the ring, nb_slots - 1 frames later, which consumers slower
+        than that can check with valid, or avoid by copying the frame.
+
+        Args:
+            shm (shared_memory.SharedMemory): Shared memory of the bus
+            owner (bool): Whether this process created the bus and unlinks it
+        """
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray(1, dtype=HEADER, buffer=shm.buf)[0]
+        if self.header["magic"] != MAGIC:
+            raise ValueError(f"{shm.name} is not a frame bus")
+
+        n = int(self.header["nb_slots"])
+        self.nb_slots = n
+        self.frame_shape = (
+            int(self.header["height"]),
+            int(self.header["width"]),
+            int(self.header["channels"]),
+        )
+        self.slots = np.ndarray(n, dtype=SLOT, buffer=shm.buf, offset=HEADER.itemsize)
+        self.frames = np.ndarray(
+            (n, *self.frame_shape),
+            dtype=np.uint8,
+            buffer=shm.buf,
+            offset=_frames_offset(n),
+        )
+        self.next_seq = int(self.header["latest"]) + 1
+
+    @classmethod
+    def create(cls, frame_shape, nb_slots=4, name=None):
+        """Allocates a new bus.
+
+        Args:
+            frame_shape (tupple(int)): Shape of the frames (height, width, channels)
+            nb_slots (int, optional): Number of frames in the ring, at least 2.
+                Defaults to 4.
+            name (str, optional): Name of the shared memory. Defaults to a random
+                name, see FrameBus.name.
+
+        Returns:
+            FrameBus: Bus owned by the calling process
+        """
+        if nb_slots < 2:
+            raise ValueError("A frame bus needs at least 2 slots")
+        h, w, c = frame_shape
+        size = _frames_offset(nb_slots) + nb_slots * h * w * c
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray(1, dtype=HEADER, buffer=shm.buf)
+        header[0] = (MAGIC, nb_slots, h, w, c, -1, 0)
+        slots = np.ndarray(nb_slots, dtype=SLOT, buffer=shm.buf, offset=HEADER.itemsize)
+        slots[:] = (0, -1, 0.0)
+        del header, slots
+        _created.add(shm._name)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attaches to the bus of another process.
+
+        Args:
+            name (str): Name of the bus
+
+        Returns:
+            FrameBus: Bus
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13, attaching registers the segment with the resource
+            # tracker of the process, which unlinks it when the process exits
+            shm = shared_memory.SharedMemory(name=name)
+            if shm._name not in _created:
+                resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def closed(self):
+        return bool(self.header["closed"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def begin_write(self):
+        """Starts writing the next frame, see end_write. Producer only.
+
+        Returns:
+            ndarray: View on the slot to fill, e.g. with cap.read(image=view)
+        """
+        slot = self.next_seq % self.nb_slots
+        self.slots[slot]["version"] += 1
+        return self.frames[slot]
+
+    def end_write(self, timestamp=None):
+        """Publishes the frame started with begin_write.
+
+        Args:
+            timestamp (float, optional): Capture time. Defaults to now.
+
+        Returns:
+            int: Sequence number of the frame
+        """
+        seq = self.next_seq
+        state = self.slots[seq % self.nb_slots]
+        state["seq"] = seq
+        state["timestamp"] = time.perf_counter() if timestamp is None else timestamp
+        state["version"] += 1
+        self.header["latest"] = seq
+        self.next_seq += 1
+        return seq
+
+    def abort_write(self):
+        """Gives up the frame started with begin_write, its slot being left empty"""
+        state = self.slots[self.next_seq % self.nb_slots]
+        state["seq"] = -1
+        state["version"] += 1
+
+    def write(self, frame, timestamp=None):
+        """Copies a frame to the next slot. Producer only.
+
+        Args:
+            frame (ndarray): Frame
+            timestamp (float, optional): Capture time. Defaults to now.
+
+        Returns:
+            int: Sequence number of the frame
+        """
+        view = self.begin_write()
+        try:
+            np.copyto(view, frame)
+        except BaseException:
+            self.abort_write()
+            raise
+        return self.end_write(timestamp)
+
+    def valid(self, seq):
+        """Returns:
+        bool: Whether the slot of a frame still holds it, complete
+        """
+        state = self.slots[seq % self.nb_slots]
+        return state["version"] % 2 == 0 and state["seq"] == seq
+
+    def latest(self):
+        """Reads the newest frame, without copying it.
+
+        Returns:
+            tuple(int, float, ndarray): Sequence number, capture time and view on
+                the frame, None if no frame was written yet
+        """
+        while True:
+            seq = int(self.header["latest"])
+            if seq < 0:
+                return None
+            slot = seq % self.nb_slots
+            state = self.slots[slot]
+            timestamp = float(state["timestamp"])
+            if self.valid(seq):
+                return seq, timestamp, self.frames[slot]
+
+    def wait(self, after=-1, timeout=None, poll=0.0005):
+        """Waits for a frame newer than a sequence number, see latest.
+
+        Args:
+            after (int, optional): Sequence number of the last frame read.
+                Defaults to -1.
+            timeout (float, optional): Seconds to wait. Defaults to None, forever.
+            poll (float, optional): Seconds between two checks. Defaults to 0.0005.
+
+        Returns:
+            tuple(int, float, ndarray): Newest frame, see latest, None if the
+                producer closed the bus or on timeout
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            if int(self.header["latest"]) > after:
+                return self.latest()
+            if self.closed or (deadline and time.perf_counter() > deadline):
+                return None
+            time.sleep(poll)
+
+    def close(self):
+        """Detaches from the bus. The producer marks it closed for the consumers
+        and frees it. The views returned by latest must be released first."""
+        if self.shm.buf is None:
+            return
+        if self.owner:
+            self.header["closed"] = 1
+        del self.header, self.slots, self.frames
+        self.shm.close()
+        if self.owner:
+            _created.discard(self.shm._name)
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                # Already unlinked by another process, forget it all the same
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+
+
+def capture_to_bus(cap, bus, max_frames=None):
+    """Reads a camera into a bus, each frame being decoded directly into its slot.
+    Runs in the capture process until the camera stops or max_frames are read.
+
+    Args:
+        cap (cv2.VideoCapture): Opened camera
+        bus (FrameBus): Bus created by the calling process
+        max_frames (int, optional): Number of frames to read. Defaults to None.
+
+    Returns:
+        int: Number of frames read
+    """
+    nb_frames = 0
+    while max_frames is None or nb_frames < max_frames:
+        view = bus.begin_write()
+        try:
+            is_reading, frame = cap.read(image=view)
+            if is_reading and frame is not view:
+                # The camera's resolution doesn't match the bus, raises
+                np.copyto(view, frame)
+        except BaseException:
+            bus.abort_write()
+            raise
+        if not is_reading:
+            bus.abort_write()
+            break
+        bus.end_write()
+        nb_frames += 1
+
+    return nb_frames
@@ -1,7 +1,13 @@
+import functools
 import numpy as np
-import random
 import time
 
+from src import eventlog
+from src.profiling import timed
+
+# Probability of each dice value
+DICE_P = np.full(6, 1 / 6)
+
 
 def ask_player_name():
     """Asks the player for their name.
@@ -35,66 +41,150 @@ def ask_nb_cpus():
     return nb_cpus
 
 
+class Narrator:
+    __slots__ = ("headless",)
+
+    def __init__(self, headless=False):
+        """Base class for the objects talking to the console. Messages are printed
+        and paced for a human reader, unless headless where both are skipped.
+
+        Args:
+            headless (bool, optional): Disables printing and pauses. Defaults to False.
+        """
+        self.headless = headless
+
+    def say(self, *args):
+        """Prints a message, unless headless"""
+        if not self.headless:
+            print(*args)
+
+    def pause(self, seconds):
+        """Waits for the reader to catch up, unless headless
+
+        Args:
+            seconds (float): Duration of the pause
+        """
+        if not self.headless:
+            time.sleep(seconds)
+
+
 class Bid:
-    def __init__(self, player_name, count, value, challenged_by):
-        """Constructor of the bid class.
+    __slots__ = ("bidder", "code", "challenger")
+
+    def __init__(self, bidder, count, value, challenger=None):
+        """Constructor of the bid class. The count and value are encoded in a single
+        integer, count * 6 + value - 1, so that bids are ordered by count then
+        value. A round starts from Bid(None, 0, 1), which any bid raises.
 
         Args:
-            player_name (str): Name of the player placing the bid
+            bidder (int): Id of the player placing the bid, None before the first bid
             count (int): Count of a particular value on all dices
-            value (int): Dice value
-            challenged_by (str): Name of the player challenging this bid
+            value (int): Dice value, from 1 to 6
+            challenger (int, optional): Id of the player challenging this bid.
+                Defaults to None.
+        """
+        self.bidder = bidder
+        self.code = count * 6 + value - 1
+        self.challenger = challenger
+
+    @property
+    def count(self):
+        return self.code // 6
+
+    @property
+    def value(self):
+        return self.code % 6 + 1
+
+    def raises(self, last_bid):
+        """Checks that the bid raises the last one: neither the count nor the value
+        decrease, and the bid is higher.
+
+        Args:
+            last_bid (object Bid): Last bid
+
+        Returns:
+            bool: Whether the bid is a valid raise
         """
-        self.player_name = player_name
-        self.count = count
-        self.value = value
-        self.challenged_by = challenged_by
+        return self.code > last_bid.code and self.code % 6 >= last_bid.code % 6
+
 
+class Player(Narrator):
+    __slots__ = ("rng", "name", "nb_dices", "dices_counts", "player_id")
 
-class Player:
-    def __init__(self, name, nb_dices):
-        """Constructor of the Player class.
+    def __init__(self, name, nb_dices, headless=False, rng=None):
+        """Constructor of the Player class. The dices are kept as the number of
+        dices showing each value, dices_counts[v] for v from 1 to 6. The player's
+        id is its index in the game, set by Game.
 
         Args:
             name (str): Player's name
             nb_dices (int): Player's initial number of dices
+            headless (bool, optional): Disables printing and pauses. Defaults to False.
+            rng (np.random.Generator, optional): Random generator of the player.
+                Defaults to a freshly seeded one.
         """
+        super().__init__(headless)
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.name = name
         self.nb_dices = nb_dices
-        self.dices_values = []
+        self.dices_counts = np.zeros(7, dtype=np.int64)
+        self.player_id = None
+
+    @property
+    def dices_values(self):
+        """Returns:
+        ndarray: Values of the dices, in increasing order
+        """
+        return np.repeat(np.arange(1, 7), self.dices_counts[1:])
 
     def roll_dices(self):
         """Rolls the dices"""
-        self.dices_values = np.random.randint(low=1, high=7, size=self.nb_dices)
+        self.dices_counts[1:] = self.rng.multinomial(self.nb_dices, DICE_P)
 
     def disclose_dices(self):
         """Prints the values of the dices rolled"""
-        print(f"{self.name} rolled: {self.dices_values}")
-        time.sleep(0.5)
+        if self.headless:
+            return  # skips formatting the array, which dominates headless games
+        self.say(f"{self.name} rolled: {self.dices_values}")
+        self.pause(0.5)
+
+    def observe_table(self, dices, seat):
+        """Called at the start of every round with the seating of the table.
+        Unused by default.
+
+        Args:
+            dices (list[int]): Number of dices of each player, in playing order
+            seat (int): Position of the player in the playing order
+        """
 
     def remove_dice(self):
         """Removes a dice from the player"""
         if self.nb_dices > 0:
             self.nb_dices -= 1
-            print(f"\n{self.name} lost a dice and has now {self.nb_dices} left")
+            self.say(f"\n{self.name} lost a dice and has now {self.nb_dices} left")
         else:
-            print(f"\n{self.name} has no dices left and was eliminated!")
-        time.sleep(0.5)
+            self.say(f"\n{self.name} has no dices left and was eliminated!")
+        self.pause(0.5)
 
 
 class HumanPlayer(Player):
-    def __init__(self, name, nb_dices):
+    __slots__ = ()
+
+    def __init__(self, name, nb_dices, headless=False, rng=None):
         """Constructor for the human player class
 
         Args:
             name (str): Player's name
             nb_dices (int): Player's initial number of dices
+            headless (bool, optional): Disables printing and pauses. Defaults to False.
+            rng (np.random.Generator, optional): Random generator of the player.
+                Defaults to a freshly seeded one.
         """
-        super().__init__(name, nb_dices)
+        super().__init__(name, nb_dices, headless, rng)
 
     def challenge_last_bid(self, last_bid, total_nb_dices):
         """Asks the player if they want to challenge the last bid. If yes
-        update the last bid "challenged_by" argument to the player's name.
+        update the last bid "challenger" argument to the player's id.
 
         Args:
             last_bid (Bid): Last bid
@@ -107,13 +197,13 @@ class HumanPlayer(Player):
         while True:
             challenge = input("Challenge the last bid? (y/n): ")
             if challenge == "y":
-                last_bid.challenged_by = self.name
+                last_bid.challenger = self.player_id
                 break
             elif challenge == "n":
                 break
             else:
-                print(f"   Invalid input: should be 'y' or 'n'")
-        time.sleep(0.5)
+                self.say(f"   Invalid input: should be 'y' or 'n'")
+        self.pause(0.5)
         return last_bid
 
     def place_bid(self, last_bid, total_nb_dice):
@@ -129,44 +219,44 @@ class HumanPlayer(Player):
             object Bid: Updated Bid
         """
 
-        bid = Bid(player_name=self.name, count=0, value=0, challenged_by=None)
-
         while True:
             s = input("Place your bid! (count value): ")
             parts = s.split()
             # check valid format
             if len(parts) != 2 or not all(part.isdigit() for part in parts):
-                print("   Invalid input: should be two integers separated by a space.")
+                self.say(
+                    "   Invalid input: should be two integers separated by a space."
+                )
             else:
                 count, value = map(int, parts)
-                if (
-                    (count > last_bid.count and value == last_bid.value)
-                    or (count == last_bid.count and value > last_bid.value)
-                    or (count > last_bid.count and value > last_bid.value)
-                ):
-                    bid.count = count
-                    bid.value = value
+                bid = Bid(self.player_id, count, value)
+                if count >= 1 and 1 <= value <= 6 and bid.raises(last_bid):
                     break
                 else:
-                    print(f"   Invalid input: You have to raise the bid!")
-        time.sleep(0.5)
+                    self.say(f"   Invalid input: You have to raise the bid!")
+        self.pause(0.5)
         return bid
 
 
 class CpuPlayer(Player):
-    def __init__(self, name, nb_dices):
+    __slots__ = ()
+
+    def __init__(self, name, nb_dices, headless=False, rng=None):
         """Constructor for the cpu player class
 
         Args:
             name (str): Player's name
             nb_dices (int): Player's initial number of dices
+            headless (bool, optional): Disables printing and pauses. Defaults to False.
+            rng (np.random.Generator, optional): Random generator of the player.
+                Defaults to a freshly seeded one.
         """
-        super().__init__(name, nb_dices)
+        super().__init__(name, nb_dices, headless, rng)
 
     # TODO improve AI
     def challenge_last_bid(self, last_bid, total_nb_dice):
         """Potentially challenges the last bid made. If last bid is challenged,
-        update the "challenged_by" argument to the player's name.
+        update the "challenger" argument to the player's id.
 
         Args:
             last_bid (object Bid): Last bid
@@ -176,14 +266,14 @@ class CpuPlayer(Player):
             object Bid: Updated last bid
         """
 
-        rand = random.uniform(0, 1)
+        rand = self.rng.random()
         p = 0.1
         if (
             (rand < p)
             or (last_bid.count > total_nb_dice)
             or not (1 <= last_bid.value <= 6)
         ):
-            last_bid.challenged_by = self.name
+            last_bid.challenger = self.player_id
 
         return last_bid
 
@@ -199,61 +289,264 @@ class CpuPlayer(Player):
             object Bid: Updated last bid
         """
 
-        bid = Bid(
-            player_name=self.name,
-            count=0,
-            value=0,
-            challenged_by=None,
-        )
-
-        if last_bid.player_name is not None:
-            if last_bid.value == 6:
-                bid.count = last_bid.count + 1
-                bid.value = last_bid.value
+        if last_bid.bidder is not None:
+            count, value = last_bid.count, last_bid.value
+            if value == 6:
+                count += 1
             else:
-                rand = random.uniform(0, 1)
+                rand = self.rng.random()
                 p = 0.5
                 if rand < p:
-                    bid.count = last_bid.count + 1
-                    bid.value = last_bid.value
+                    count += 1
                 else:
-                    bid.count = last_bid.count
-                    bid.value = last_bid.value + 1
-            print(f"{self.name} raised the bid to {bid.count} {bid.value}")
+                    value += 1
+            bid = Bid(self.player_id, count, value)
+            self.say(f"{self.name} raised the bid to {bid.count} {bid.value}")
 
         else:
-            bid.count = random.randint(2, 4)
-            bid.value = random.randint(1, 6)
+            count = int(self.rng.integers(2, 5))
+            value = int(self.rng.integers(1, 7))
+            bid = Bid(self.player_id, count, value)
+
+            self.say(f"{self.name} placed a first bid of {bid.count} {bid.value}")
+
+        self.pause(0.5)
+
+        return bid
+
+
+@functools.lru_cache(maxsize=None)
+def binomial_tables(max_dices):
+    """Probabilities of the number of dices showing a given value among unknown
+    dices, X ~ Binomial(n, 1/6), for every n up to max_dices. Computed once with
+    the recurrence P(n, k) = 5/6 P(n-1, k) + 1/6 P(n-1, k-1).
+
+    Args:
+        max_dices (int): Largest number of unknown dices
+
+    Returns:
+        tuple(ndarray): pmf[n, k] = P(X = k) and tail[n, k] = P(X >= k)
+    """
+    pmf = np.zeros((max_dices + 1, max_dices + 2))
+    pmf[0, 0] = 1.0
+    for n in range(1, max_dices + 1):
+        pmf[n, 1:] = pmf[n - 1, :-1] / 6
+        pmf[n] += pmf[n - 1] * 5 / 6
+    tail = np.cumsum(pmf[:, ::-1], axis=1)[:, ::-1]
+
+    return pmf, tail
+
+
+class ProbabilisticCpuPlayer(CpuPlayer):
+    # Game.check_bid only accepts a bid if the count is exact. Set to False to
+    # reason on "at least count" bids instead.
+    exact_count = True
+
+    __slots__ = ("pmf", "tail")
+
+    def __init__(self, name, nb_dices, headless=False, rng=None, max_dices=64):
+        """Constructor for the probabilistic cpu player class. Decisions are based on
+        the probability of a bid being valid given the player's own dices, the other
+        dices showing each value with probability 1/6. Probabilities are looked up
+        in tables precomputed once, see binomial_tables.
+
+        Args:
+            name (str): Player's name
+            nb_dices (int): Player's initial number of dices
+            headless (bool, optional): Disables printing and pauses. Defaults to False.
+            rng (np.random.Generator, optional): Random generator of the player.
+                Defaults to a freshly seeded one.
+            max_dices (int, optional): Largest number of dices in a game.
+                Defaults to 64.
+        """
+        super().__init__(name, nb_dices, headless, rng)
+        self.pmf, self.tail = binomial_tables(max_dices)
+
+    def p_valid(self, count, value, own_counts, nb_unknown):
+        """Probability of a bid being valid.
+
+        Args:
+            count (int): Count of the bid
+            value (int): Value of the bid
+            own_counts (ndarray): Number of the player's dices showing each value
+            nb_unknown (int): Number of dices of the other players
+
+        Returns:
+            float: Probability
+        """
+        need = count - own_counts[value]
+        if self.exact_count:
+            return self.pmf[nb_unknown, need] if 0 <= need <= nb_unknown else 0.0
+        return self.tail[nb_unknown, max(need, 0)] if need <= nb_unknown else 0.0
+
+    def best_bid(self, last_bid, own_counts, total_nb_dice):
+        """Finds the most probable bid raising the last one. For each value the
+        best count is the smallest allowed one for "at least" bids, and the one
+        closest to the binomial mode for exact bids, so only 6 bids are evaluated.
+
+        Args:
+            last_bid (object Bid): Last bid
+            own_counts (ndarray): Number of the player's dices showing each value
+            total_nb_dice (int): Total number of dices in the game
+
+        Returns:
+            tuple(int, int, float): Count, value and probability of the best bid,
+                None if no bid can be valid
+        """
+        nb_unknown = total_nb_dice - self.nb_dices
+        mode = (nb_unknown + 1) // 6
+
+        best = None
+        for value in range(max(last_bid.value, 1), 7):
+            min_count = max(last_bid.count + (value == last_bid.value), 1)
+            count = min_count
+            if self.exact_count:
+                count = max(min_count, int(own_counts[value]) + mode)
+            if count > total_nb_dice:
+                continue
+            p = self.p_valid(count, value, own_counts, nb_unknown)
+            if best is None or p > best[2]:
+                best = (count, value, p)
+
+        return best
+
+    def challenge_last_bid(self, last_bid, total_nb_dice):
+        """Challenges the last bid if the probability of loosing by challenging it
+        is lower than the probability of loosing if the best raise is challenged.
+
+        Args:
+            last_bid (object Bid): Last bid
+            total_nb_dice (int): Total number of dices in the game
+
+        Returns:
+            object Bid: Updated last bid
+        """
+        if (last_bid.count > total_nb_dice) or not (1 <= last_bid.value <= 6):
+            last_bid.challenger = self.player_id
+            return last_bid
+
+        own_counts = self.dices_counts
+        nb_unknown = total_nb_dice - self.nb_dices
+        p_last = self.p_valid(last_bid.count, last_bid.value, own_counts, nb_unknown)
+        best = self.best_bid(last_bid, own_counts, total_nb_dice)
+        p_raise = best[2] if best is not None else 0.0
+
+        if p_last < 1 - p_raise:
+            last_bid.challenger = self.player_id
+
+        return last_bid
+
+    def place_bid(self, last_bid, total_nb_dice):
+        """Places the most probable bid raising the last one.
 
-            print(f"{self.name} placed a first bid of {bid.count} {bid.value}")
+        Args:
+            last_bid (object Bid): Last bid
+            total_nb_dice (int): Total number of dices in the game
 
-        time.sleep(0.5)
+        Returns:
+            object Bid: Updated last bid
+        """
+        own_counts = self.dices_counts
+        best = self.best_bid(last_bid, own_counts, total_nb_dice)
+        if best is None:
+            # no raise can be valid, fall back to the smallest one
+            best = (last_bid.count + 1, max(last_bid.value, 1), 0.0)
+
+        bid = Bid(self.player_id, best[0], best[1])
+
+        if last_bid.bidder is not None:
+            self.say(f"{self.name} raised the bid to {bid.count} {bid.value}")
+        else:
+            self.say(f"{self.name} placed a first bid of {bid.count} {bid.value}")
+
+        self.pause(0.5)
 
         return bid
 
 
-class Game:
-    def __init__(self, player_name, nb_cpus, nb_dices):
-        """Constructor of the Game class
+class Game(Narrator):
+    __slots__ = (
+        "round",
+        "human_player",
+        "cpu_players",
+        "players",
+        "all_players",
+        "nb_players",
+        "total_nb_dice",
+        "event_log",
+        "game_id",
+    )
+
+    def __init__(
+        self,
+        player_name,
+        nb_cpus,
+        nb_dices,
+        headless=False,
+        human_player=None,
+        cpu_player_cls=CpuPlayer,
+        rng=None,
+        event_log=None,
+    ):
+        """Constructor of the Game class. Players are identified by their index in
+        the players list, the human player's seat being 0.
 
         Args:
             player_name (str): Player's name
             nb_cpus (_type_): Number of computer-controlled oponents
             nb_dices (_type_): Initial number of dices for each player
+            headless (bool, optional): Disables printing, pauses and waiting for the
+                player between rounds. Defaults to False.
+            human_player (Player, optional): Player taking the human player's seat,
+                e.g. a CpuPlayer to run games without any input. Defaults to None.
+            cpu_player_cls (type or list[type], optional): Class of the
+                computer-controlled oponents, or one class per oponent.
+                Defaults to CpuPlayer.
+            rng (np.random.Generator, optional): Random generator shared by the
+                computer-controlled oponents. Defaults to a freshly seeded one.
+            event_log (EventLogWriter, optional): Log receiving the rolls, bids,
+                challenges, reveals and dice losses of the game. Defaults to None.
         """
+        super().__init__(headless)
+        rng = rng if rng is not None else np.random.default_rng()
 
         self.round = 1
-        self.human_player = HumanPlayer(name=player_name, nb_dices=nb_dices)
+        if human_player is None:
+            human_player = HumanPlayer(name=player_name, nb_dices=nb_dices, rng=rng)
+        self.human_player = human_player
+        if isinstance(cpu_player_cls, type):
+            cpu_player_cls = [cpu_player_cls] * nb_cpus
         self.cpu_players = [
-            CpuPlayer(name=f"cpu{i}", nb_dices=nb_dices) for i in range(nb_cpus)
+            cls(name=f"cpu{i}", nb_dices=nb_dices, headless=headless, rng=rng)
+            for i, cls in enumerate(cpu_player_cls)
         ]
-        self.all_players = [self.human_player] + self.cpu_players
+        self.players = [self.human_player] + self.cpu_players
+        for i, p in enumerate(self.players):
+            p.player_id = i
+        self.all_players = list(self.players)
         self.nb_players = len(self.all_players)
         self.total_nb_dice = nb_dices * self.nb_players
-        print(
+        self.event_log = event_log
+        self.game_id = None
+        if event_log is not None:
+            self.game_id = event_log.start_game(self.nb_players, nb_dices)
+        self.say(
             f"\nStarting a new game of {self.nb_players} players with {nb_dices} dices each."
         )
-        time.sleep(0.5)
+        self.pause(0.5)
+
+    def log_event(self, kind, player=0, code=0, arg=0, dices=eventlog.NO_DICES):
+        """Appends an event of the current round to the event log, if any. See
+        eventlog.RECORD for the meaning of the arguments."""
+        if self.event_log is not None:
+            self.event_log.append(
+                self.game_id, self.round, kind, player, code, arg, dices
+            )
+
+    def log_round_end(self, kind, player, arg=0):
+        """Appends an event of the round just played, once Game.round moved on"""
+        if self.event_log is not None:
+            self.event_log.append(self.game_id, self.round - 1, kind, player, 0, arg)
 
     def play_bid_round(self):
         """Plays a round of bidding.
@@ -262,7 +555,7 @@ class Game:
             object Bid: Last bid made in the round
         """
         bid_round = 0
-        last_bid = Bid(player_name=None, count=0, value=0, challenged_by=None)
+        last_bid = Bid(None, 0, 1)
 
         while True:
             for i, p in enumerate(self.all_players):
@@ -270,12 +563,19 @@ class Game:
                     last_bid = p.place_bid(last_bid, self.total_nb_dice)
                 else:
                     last_bid = p.challenge_last_bid(last_bid, self.total_nb_dice)
-                    if last_bid.challenged_by is not None:
+                    if last_bid.challenger is not None:
+                        self.log_event(
+                            eventlog.CHALLENGE,
+                            last_bid.challenger,
+                            last_bid.code,
+                            last_bid.bidder,
+                        )
                         break
                     else:
                         last_bid = p.place_bid(last_bid, self.total_nb_dice)
+                self.log_event(eventlog.BID, last_bid.bidder, last_bid.code)
 
-            if last_bid.challenged_by is not None:
+            if last_bid.challenger is not None:
                 break
 
             bid_round += 1
@@ -293,60 +593,77 @@ class Game:
         Returns:
             object Player: Looser of the bidding round
         """
-        all_dices = np.concatenate([p.dices_values for p in self.all_players], axis=0)
-        bid_value_count = np.count_nonzero(all_dices == bid.value)
+        value = bid.value
+        bid_value_count = sum(int(p.dices_counts[value]) for p in self.all_players)
+        bidder = self.players[bid.bidder]
+        challenger = self.players[bid.challenger]
 
-        print("")
-        print(f"There are {bid_value_count} {bid.value}s on the table")
-        time.sleep(0.25)
+        self.say("")
+        self.say(f"There are {bid_value_count} {bid.value}s on the table")
+        self.pause(0.25)
+
+        self.log_event(eventlog.REVEAL, code=bid.code, arg=bid_value_count)
 
         bid_valid = bid_value_count == bid.count
         if bid_valid:
-            print(
-                f"{bid.challenged_by} shouldn't have challenged {bid.player_name}'s bid!"
+            self.say(
+                f"{challenger.name} shouldn't have challenged {bidder.name}'s bid!"
             )
         else:
-            print(
-                f"{bid.challenged_by} was right to challenge {bid.player_name}'s bid!"
-            )
-        time.sleep(0.5)
+            self.say(f"{challenger.name} was right to challenge {bidder.name}'s bid!")
+        self.pause(0.5)
 
-        looser_name = bid.challenged_by if bid_valid else bid.player_name
-        looser = next((p for p in self.all_players if p.name == looser_name))
-
-        return looser
+        return challenger if bid_valid else bidder
 
-    def play_round(self):
-        """Plays a full round"""
-        print(f"\n\n---------- Round {self.round} ----------")
-        print(f"\n{self.total_nb_dice} dices are still in the game.")
+    def start_round(self):
+        """Starts a round: all players roll their dices and the human player's roll
+        is presented to them"""
+        self.say(f"\n\n---------- Round {self.round} ----------")
+        self.say(f"\n{self.total_nb_dice} dices are still in the game.")
         for p in self.all_players:
-            print(f"   {p.name} has {p.nb_dices} left.")
-        time.sleep(0.5)
+            self.say(f"   {p.name} has {p.nb_dices} left.")
+        self.pause(0.5)
 
         # all players roll their dices
         self.human_player.roll_dices()
         for p in self.cpu_players:
             p.roll_dices()
 
+        dices = [p.nb_dices for p in self.all_players]
+        for seat, p in enumerate(self.all_players):
+            p.observe_table(dices, seat)
+            if self.event_log is not None:
+                self.log_event(
+                    eventlog.ROLL, p.player_id, dices=p.dices_counts[1:].tolist()
+                )
+
         # player have their roll presented to them
-        print("")
+        self.say("")
         self.human_player.disclose_dices()
 
         # bid time!
-        print("")
-        last_bid = self.play_bid_round()
-        print(
-            f"\n{last_bid.challenged_by} challenged {last_bid.player_name}'s last bid of {last_bid.count} {last_bid.value}!"
+        self.say("")
+
+    def end_round(self, last_bid):
+        """Ends a round: reveals the dices and checks the last bid
+
+        Args:
+            last_bid (object Bid): Challenged bid
+
+        Returns:
+            object Player: Looser of the round
+        """
+        self.say(
+            f"\n{self.players[last_bid.challenger].name} challenged {self.players[last_bid.bidder].name}'s last bid of {last_bid.count} {last_bid.value}!"
         )
-        time.sleep(0.5)
+        self.pause(0.5)
 
         # all dices are revealed
-        print("")
+        self.say("")
         self.human_player.disclose_dices()
         for p in self.cpu_players:
             p.disclose_dices()
-        time.sleep(0.5)
+        self.pause(0.5)
 
         # get the looser of the bid round
         looser = self.check_bid(last_bid)
@@ -355,39 +672,91 @@ class Game:
 
         return looser
 
-    def play(self):
-        """Plays the game"""
-        while True:
-            looser = self.play_round()
+    @timed("game.play_round")
+    def play_round(self):
+        """Plays a full round
 
-            # reorder players for next round (looser starts first)
-            looser_idx = self.all_players.index(looser)
-            self.all_players = (
-                self.all_players[looser_idx:] + self.all_players[:looser_idx]
-            )
+        Returns:
+            object Player: Looser of the round
+        """
+        self.start_round()
+        last_bid = self.play_bid_round()
+        return self.end_round(last_bid)
 
-            # remove a dice from the looser
-            looser.remove_dice()
-            self.total_nb_dice -= 1
+    def remove_looser_dice(self, looser, until_last_standing=False):
+        """Removes a dice from the looser of a round, who starts the next one, and
+        eliminates the players with no dices left.
 
-            # end game if player has 0 dice
-            if self.human_player.nb_dices == 0:
-                print(f"\n{self.human_player.name} has no dice left.\nGame over\n")
-                break
+        Args:
+            looser (object Player): Looser of the round
+            until_last_standing (bool, optional): See Game.play. Defaults to False.
+
+        Returns:
+            tupple(bool, object Player): Whether the game is over, and its result as
+                returned by Game.play
+        """
+        # reorder players for next round (looser starts first)
+        looser_idx = self.all_players.index(looser)
+        self.all_players = self.all_players[looser_idx:] + self.all_players[:looser_idx]
+
+        # remove a dice from the looser
+        looser.remove_dice()
+        self.total_nb_dice -= 1
+        self.log_round_end(eventlog.LOSS, looser.player_id, looser.nb_dices)
+
+        # end game if player has 0 dice
+        if self.human_player.nb_dices == 0:
+            if not until_last_standing:
+                self.say(f"\n{self.human_player.name} has no dice left.\nGame over\n")
+                self.log_round_end(eventlog.END, eventlog.NO_PLAYER)
+                return True, None
+            if self.human_player in self.all_players:
+                self.all_players.remove(self.human_player)
+                self.nb_players = len(self.all_players)
+
+        # remove cpus players with no dices left
+        for p in self.cpu_players:
+            if p.nb_dices == 0:
+                self.cpu_players.remove(p)
+                self.all_players.remove(p)
+                self.nb_players = len(self.all_players)
 
-            # remove cpus players with no dices left
-            for p in self.cpu_players:
-                if p.nb_dices == 0:
-                    self.cpu_players.remove(p)
-                    self.all_players.remove(p)
-                    self.nb_players = len(self.all_players)
+        # end game if no cpu players remaining
+        if len(self.cpu_players) == 0:
+            self.say(f"\nNo cpu players remaining.\n{self.human_player.name} won!\n")
+            self.log_round_end(eventlog.END, self.human_player.player_id)
+            return True, self.human_player
 
-            # end game if no cpu players remaining
-            if len(self.cpu_players) == 0:
-                print(f"\nNo cpu players remaining.\n{self.human_player.name} won!\n")
-                break
+        # end game if a single cpu player remains
+        if len(self.all_players) == 1:
+            self.say(f"\n{self.all_players[0].name} is the last one standing!\n")
+            self.log_round_end(eventlog.END, self.all_players[0].player_id)
+            return True, self.all_players[0]
+
+        return False, None
+
+    def play(self, until_last_standing=False):
+        """Plays the game
+
+        Args:
+            until_last_standing (bool, optional): Keeps playing after the human
+                player's seat is eliminated, until a single player remains.
+                Defaults to False.
+
+        Returns:
+            object Player: The human player's seat if it won, or the last player
+                standing, None otherwise
+        """
+        while True:
+            looser = self.play_round()
+            over, winner = self.remove_looser_dice(looser, until_last_standing)
+            if over:
+                return winner
+
+            if self.headless:
+                continue
 
-            time.sleep(0.5)
+            self.pause(0.5)
             while True:
                 if input(f"\nPress Enter to continue   ") is not None:
                     break
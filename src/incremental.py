@@ -0,0 +1,245 @@
+import cv2
+import numpy as np
+
+from src.ip import (
+    Dice,
+    Region,
+    count_pips,
+    gray_threshold,
+    label_cleared_cv,
+    min_dice_area,
+    rgb2gray_uint8_cv,
+    segment_frame,
+)
+
+
+class IncrementalDetector:
+    def __init__(
+        self,
+        backend="opencv",
+        diff_scale=4,
+        diff_threshold=25,
+        margin=16,
+        lighting_threshold=0.25,
+        lighting_shift=8,
+        keyframe_interval=300,
+    ):
+        """Dice detection that only reprocesses the regions of the frame that
+        changed since the dices were last detected, carrying the other dices over.
+
+        Changes are found on a downscaled grayscale difference with the reference
+        frame. Changed regions are re-segmented with the gray level threshold of the
+        last full detection and their pips recounted. A full detection is run on the
+        first frame, every keyframe_interval frames, and when a global lighting
+        change is detected: too much of the frame changed at once or its mean
+        brightness shifted.
+
+        Args:
+            backend (str, optional): Segmentation backend of the full detections.
+                Defaults to "opencv".
+            diff_scale (int, optional): Downscaling factor of the difference image.
+                Defaults to 4.
+            diff_threshold (int, optional): Gray level difference for a pixel to be
+                considered changed. Defaults to 25.
+            margin (int, optional): Margin in pixels added around changed regions.
+                Defaults to 16.
+            lighting_threshold (float, optional): Fraction of changed pixels above
+                which a full detection is run. Defaults to 0.25.
+            lighting_shift (float, optional): Shift of the mean gray level above
+                which a full detection is run. Defaults to 8.
+            keyframe_interval (int, optional): Maximum number of frames between two
+                full detections. Defaults to 300.
+        """
+        self.backend = backend
+        self.diff_scale = diff_scale
+        self.diff_threshold = diff_threshold
+        self.margin = margin
+        self.lighting_threshold = lighting_threshold
+        self.lighting_shift = lighting_shift
+        self.keyframe_interval = keyframe_interval
+
+        self.dices = []
+        self.reference = None
+        self.threshold = None
+        self.frames_since_full = 0
+        self.last_mode = None
+
+    def _small_gray(self, frame):
+        """Returns:
+        ndarray: Downscaled grayscale frame used to detect changes
+        """
+        h, w = frame.shape[:2]
+        small = cv2.resize(
+            frame,
+            (w // self.diff_scale, h // self.diff_scale),
+            interpolation=cv2.INTER_NEAREST,
+        )
+        return rgb2gray_uint8_cv(small)
+
+    def _full_detection(self, frame, small):
+        """Runs the full detection and resets the reference frame."""
+        gray, _, bin, label_image, regions = segment_frame(frame, self.backend)
+        regions = [r for r in regions if r.area >= min_dice_area(frame.shape)]
+        values = count_pips(label_image, regions)
+
+        self.dices = [
+            Dice(center=r.centroid, bbox=r.bbox, value=v)
+            for r, v in zip(regions, values)
+        ]
+        self.threshold = gray_threshold(gray, bin)
+        self.reference = small
+        self.frames_since_full = 0
+        self.last_mode = "full"
+
+    def _changed_rois(self, mask, frame_shape):
+        """Converts the changed pixels of the difference image to regions of the
+        full resolution frame, grown to fully contain the dices they touch.
+
+        Args:
+            mask (ndarray): Binary difference image
+            frame_shape (tupple(int)): Shape of the frame
+
+        Returns:
+            list[tupple(int)]: Regions of interest (top, left, bottom, right)
+        """
+        h, w = frame_shape[:2]
+        mask = cv2.dilate(mask, np.ones((3, 3), dtype=np.uint8))
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+        rois = []
+        for x, y, bw, bh, _ in stats[1:]:
+            s = self.diff_scale
+            rois.append(
+                [
+                    max(0, y * s - self.margin),
+                    max(0, x * s - self.margin),
+                    min(h, (y + bh) * s + self.margin),
+                    min(w, (x + bw) * s + self.margin),
+                ]
+            )
+
+        # Grow the regions until they no longer cut through a dice, merging the
+        # ones that overlap
+        boxes = [d.bbox for d in self.dices]
+        changed = True
+        while changed:
+            changed = False
+            for roi in rois:
+                for box in boxes:
+                    if _intersects(roi, box) and not _contains(roi, box):
+                        roi[:] = _union(roi, box)
+                        changed = True
+
+            merged = []
+            for roi in rois:
+                for other in merged:
+                    if _intersects(other, roi):
+                        other[:] = _union(other, roi)
+                        changed = True
+                        break
+                else:
+                    merged.append(roi)
+            rois = merged
+
+        return [tuple(r) for r in rois]
+
+    def _detect_in_roi(self, frame, roi):
+        """Segments a region of interest with the threshold of the last full
+        detection and counts the pips of the dices found.
+
+        Returns:
+            list[Dice]: Dices fully contained in the region
+        """
+        top, left, bottom, right = roi
+        gray = rgb2gray_uint8_cv(frame[top:bottom, left:right])
+        _, bin = cv2.threshold(gray, self.threshold, 255, cv2.THRESH_BINARY)
+        label_image, regions = label_cleared_cv(bin)
+        regions = [r for r in regions if r.area >= min_dice_area(frame.shape)]
+        values = count_pips(label_image, regions)
+
+        dices = []
+        for r, v in zip(regions, values):
+            region = Region(
+                label=r.label,
+                area=r.area,
+                bbox=(
+                    r.bbox[0] + top,
+                    r.bbox[1] + left,
+                    r.bbox[2] + top,
+                    r.bbox[3] + left,
+                ),
+                centroid=(r.centroid[0] + top, r.centroid[1] + left),
+            )
+            dices.append(Dice(center=region.centroid, bbox=region.bbox, value=v))
+
+        return dices
+
+    def detect(self, frame):
+        """Detects the dices on the current frame.
+
+        Args:
+            frame (ndarray): Current frame
+
+        Returns:
+            list[Dice]: list of Dices found on the frame
+        """
+        small = self._small_gray(frame)
+        self.frames_since_full += 1
+
+        if (
+            self.reference is None
+            or self.reference.shape != small.shape
+            or self.frames_since_full >= self.keyframe_interval
+        ):
+            self._full_detection(frame, small)
+            return self.dices
+
+        diff = cv2.absdiff(small, self.reference)
+        _, mask = cv2.threshold(diff, self.diff_threshold, 255, cv2.THRESH_BINARY)
+        nb_changed = cv2.countNonZero(mask)
+
+        if nb_changed == 0:
+            self.last_mode = "static"
+            return self.dices
+
+        shift = abs(cv2.mean(small)[0] - cv2.mean(self.reference)[0])
+        if (
+            nb_changed > self.lighting_threshold * mask.size
+            or shift > self.lighting_shift
+        ):
+            self._full_detection(frame, small)
+            return self.dices
+
+        rois = self._changed_rois(mask, frame.shape)
+        dices = [d for d in self.dices if not any(_intersects(r, d.bbox) for r in rois)]
+        for roi in rois:
+            dices += self._detect_in_roi(frame, roi)
+            top, left = roi[0] // self.diff_scale, roi[1] // self.diff_scale
+            bottom, right = -(-roi[2] // self.diff_scale), -(-roi[3] // self.diff_scale)
+            self.reference[top:bottom, left:right] = small[top:bottom, left:right]
+
+        self.dices = dices
+        self.last_mode = "roi"
+
+        return self.dices
+
+
+def _intersects(a, b):
+    """Returns:
+    bool: Whether two boxes (top, left, bottom, right) overlap
+    """
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _contains(a, b):
+    """Returns:
+    bool: Whether box a fully contains box b
+    """
+    return a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2] and a[3] >= b[3]
+
+
+def _union(a, b):
+    """Returns:
+    list[int]: Smallest box containing boxes a and b
+    """
+    return [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
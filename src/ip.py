@@ -1,10 +1,21 @@
 import numpy as np
 import cv2
 
-from skimage.color import rgb2gray
-from skimage.filters import threshold_otsu
-from skimage.segmentation import clear_border
-from skimage.measure import label, regionprops
+# skimage is imported by the functions of the skimage backend only, its import
+# alone taking several hundred milliseconds
+
+from src.profiling import stage, timed
+
+BACKENDS = ("skimage", "opencv")
+
+# Minimum area of a segmented region to be considered a dice, as a fraction of the
+# frame area (100 pixels on a 640x480 frame)
+MIN_DICE_AREA_RATIO = 100 / (640 * 480)
+
+# Luminance weights used by skimage's rgb2gray. cv2.transform rounds where
+# rgb2gray_uint8 truncates, so the grayscale images of the two backends differ by
+# one level on part of the pixels, which doesn't change the detections
+_GRAY_WEIGHTS = np.array([[0.2125, 0.7154, 0.0721]], dtype=np.float32)
 
 
 def rgb2gray_uint8(img):
@@ -16,6 +27,7 @@ def rgb2gray_uint8(img):
     Returns:
         ndarray: grayscale image
     """
+    from skimage.color import rgb2gray
 
     gray = rgb2gray(img)
     gray = (gray * 255).astype(np.uint8)
@@ -50,6 +62,8 @@ def otsu_uint8(img):
     Returns:
         ndarray: Binarized image
     """
+    from skimage.filters import threshold_otsu
+
     t = threshold_otsu(img)
     retval = np.zeros_like(img).astype(np.uint8)
     retval[img > t] = 255
@@ -70,34 +84,252 @@ def invert_uint8(img):
     return retval
 
 
-class Dice:
-    def __init__(self, in_img, center, bbox, value=None):
-        """Constructor for the Dice class
+def min_dice_area(shape):
+    """Minimum area of a dice on an image, independent of the resolution.
+
+    Args:
+        shape (tupple(int)): Shape of the image
+
+    Returns:
+        float: Minimum area in pixels
+    """
+    return MIN_DICE_AREA_RATIO * shape[0] * shape[1]
+
+
+def rgb2gray_uint8_cv(img, out=None):
+    """Converts RGB image to 8bit grayscale without leaving the uint8 domain.
+
+    Args:
+        img (ndarray): RGB image
+        out (ndarray, optional): Preallocated output image. Defaults to None.
+
+    Returns:
+        ndarray: grayscale image
+    """
+    return cv2.transform(img, _GRAY_WEIGHTS, dst=out)
+
+
+def normalize_uint8_inplace(img):
+    """Normalizes an 8bit image in place. The min/max are found in a single pass
+    and the rescaling is applied through a lookup table, which reproduces the
+    truncation of normalize_uint8 exactly. A flat image becomes black, as with
+    normalize_uint8 where its 0 / 0 pixels are cast to 0.
+
+    Args:
+        img (ndarray): Input image, modified in place
+
+    Returns:
+        ndarray: Normalized image
+    """
+    mn, mx, _, _ = cv2.minMaxLoc(img)
+    if mx > mn:
+        lut = np.arange(256, dtype=np.float32)
+        lut = np.clip((lut - mn) / (mx - mn) * 255, 0, 255).astype(np.uint8)
+        cv2.LUT(img, lut, dst=img)
+    else:
+        img.fill(0)
+
+    return img
+
+
+def otsu_uint8_cv(img, out=None):
+    """Applies Otsu's thresholding to an 8bit image with OpenCV. Returns a
+    binary image encoded in 8bit with values [0, 255].
+
+    Args:
+        img (ndarray): Input image
+        out (ndarray, optional): Preallocated output image. Defaults to None.
+
+    Returns:
+        ndarray: Binarized image
+    """
+    _, retval = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=out)
+    return retval
+
+
+def gray_threshold(gray, bin):
+    """Gray level separating the foreground of a binary image from its background,
+    so that a thresholding computed on the normalized image can be reapplied to
+    the raw grayscale image. Any value between the brightest background pixel and
+    the darkest foreground pixel works.
+
+    Args:
+        gray (ndarray): Grayscale image
+        bin (ndarray): Binary image obtained from it
+
+    Returns:
+        int: Pixels of gray strictly above this level are foreground
+    """
+    background = gray[bin == 0]
+    return int(background.max()) if background.size else 0
+
+
+class Region:
+    def __init__(self, label, area, bbox, centroid):
+        """Lightweight equivalent of skimage's RegionProperties, holding only the
+        attributes used by the detection pipeline.
 
         Args:
-            in_img (ndarray): Input image
-            center (tupple(int)): Center coordinates (x,y)
+            label (int): Label of the region in the label image
+            area (int): Number of pixels of the region
             bbox (tupple(int)): Bounding box coordinates (top, left, bottom, right)
-            value (int, optional): Value of the dice. Defaults to None.
+            centroid (tupple(float)): Centroid coordinates (row, col)
         """
-
-        self.center = center
+        self.label = label
+        self.area = area
         self.bbox = bbox
-        self.bbox_color = [0, 0, 255]
+        self.centroid = centroid
+
+
+def label_cleared_cv(bin_img):
+    """Labels the 8-connected components of a binary image and discards the
+    ones touching the image border, equivalent to label(clear_border(bin_img)).
 
-        self.img = in_img[self.bbox[0] : self.bbox[2], self.bbox[1] : self.bbox[3]]
+    Args:
+        bin_img (ndarray): Binary image encoded in 8bit
 
-        if value is not None:
-            self.value = value
+    Returns:
+        tuple(ndarray, list[Region]): Label image and regions not touching the border
+    """
+    n, label_image, stats, centroids = cv2.connectedComponentsWithStats(
+        bin_img, connectivity=8, ltype=cv2.CV_32S
+    )
+    h, w = bin_img.shape[:2]
+
+    regions = []
+    for i in range(1, n):
+        left, top, width, height, area = stats[i]
+        if left == 0 or top == 0 or left + width == w or top + height == h:
+            sub = label_image[top : top + height, left : left + width]
+            sub[sub == i] = 0
         else:
-            gray = rgb2gray_uint8(self.img)
+            regions.append(
+                Region(
+                    label=i,
+                    area=int(area),
+                    bbox=(int(top), int(left), int(top + height), int(left + width)),
+                    centroid=(centroids[i][1], centroids[i][0]),
+                )
+            )
+
+    return label_image, regions
+
+
+def segment_frame(frame, backend="skimage"):
+    """Segmentation stages of the dice detection pipeline.
+
+    Args:
+        frame (ndarray): Current frame
+        backend (str, optional): Either "skimage" or "opencv". The opencv backend
+            stays in uint8 end to end, without float intermediate images.
+            Defaults to "skimage".
+
+    Returns:
+        tuple: grayscale, normalized, binary and label images, and list of regions
+    """
+    if backend == "skimage":
+        from skimage.measure import label, regionprops
+        from skimage.segmentation import clear_border
+
+        with stage("ip.rgb2gray"):
+            gray = rgb2gray_uint8(frame)
+        with stage("ip.normalize"):
             norm = normalize_uint8(gray)
+        with stage("ip.threshold"):
             bin = otsu_uint8(norm)
-            inv = invert_uint8(bin)
-            cleared = clear_border(inv)
-            label_image = label(cleared)
+        with stage("ip.label"):
+            label_image = label(clear_border(bin))
+        with stage("ip.regionprops"):
+            regions = regionprops(label_image)
+    elif backend == "opencv":
+        with stage("ip.rgb2gray"):
+            gray = rgb2gray_uint8_cv(frame)
+        with stage("ip.normalize"):
+            norm = normalize_uint8_inplace(gray.copy())
+        with stage("ip.threshold"):
+            bin = otsu_uint8_cv(norm)
+        with stage("ip.label"):
+            label_image, regions = label_cleared_cv(bin)
+    else:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    return gray, norm, bin, label_image, regions
+
+
+@timed("ip.count_pips")
+def count_pips(label_image, regions):
+    """Counts the pips of every dice of a frame in a single batched stage.
+
+    Pips are the holes of a dice's region in the frame's binary image, so they are
+    counted from the connected components stats of the complement of each region
+    inside its bounding box: every component not touching the bounding box border
+    is a pip. The global threshold and labels are reused, nothing is re-thresholded.
+
+    Args:
+        label_image (ndarray): Label image of the frame
+        regions (list[Region]): Regions of the dices, as returned by segment_frame
+
+    Returns:
+        list[int]: Value of each dice
+    """
+    values = []
+    for region in regions:
+        top, left, bottom, right = region.bbox
+        holes = (label_image[top:bottom, left:right] != region.label).astype(np.uint8)
+        n, _, stats, _ = cv2.connectedComponentsWithStats(
+            holes, connectivity=4, ltype=cv2.CV_32S
+        )
+        x, y, w, h = stats[1:, 0], stats[1:, 1], stats[1:, 2], stats[1:, 3]
+        inner = (x > 0) & (y > 0) & (x + w < right - left) & (y + h < bottom - top)
+        values.append(int(np.count_nonzero(inner)))
+
+    return values
+
+
+def bbox_edges(bbox):
+    """Returns the indices of the pixels of a bounding box, each pixel appearing
+    once, as drawn by Dice.get_bbox_mask.
+
+    Args:
+        bbox (tupple(int)): Bounding box coordinates (top, left, bottom, right)
+
+    Returns:
+        list[tupple]: Indices of the left, right, top and bottom edges
+    """
+    top, left, bottom, right = bbox
+    return [
+        (slice(top, bottom), left),
+        (slice(top, bottom), right),
+        (top, slice(left + 1, right)),
+        (bottom, slice(left, right)),
+    ]
+
+
+class Dice:
+    __slots__ = ("center", "bbox", "value", "img")
+
+    bbox_color = (0, 0, 255)
 
-            self.value = len(np.unique(label_image)) - 1
+    @timed("ip.Dice.__init__")
+    def __init__(self, in_img=None, center=None, bbox=None, value=None):
+        """A detected dice, a lightweight view on a row of a DetectionResult.
+
+        Args:
+            in_img (ndarray, optional): Input image, the dice's crop being copied
+                from it. Defaults to None, no crop being kept so that the dice
+                doesn't hold a reference to the frame.
+            center (tupple(int)): Center coordinates (x,y)
+            bbox (tupple(int)): Bounding box coordinates (top, left, bottom, right)
+            value (int, optional): Value of the dice, as computed by count_pips.
+                Defaults to None.
+        """
+
+        self.center = center
+        self.bbox = bbox
+        self.value = value
+        self.img = None
+        if in_img is not None:
+            self.img = in_img[bbox[0] : bbox[2], bbox[1] : bbox[3]].copy()
 
     def get_bbox_mask(self, in_img):
         """Returns a mask of the dice's bounding box
@@ -117,78 +349,445 @@ class Dice:
 
         return mask
 
+    def get_bbox_edges(self):
+        """Returns the indices of the pixels of the dice's bounding box, see
+        bbox_edges.
+
+        Returns:
+            list[tupple]: Indices of the left, right, top and bottom edges
+        """
+        return bbox_edges(self.bbox)
+
+
+class DetectionResult:
+    __slots__ = ("bboxes", "centroids", "areas", "values", "crops")
+
+    def __init__(self, bboxes, centroids, areas, values, crops=None):
+        """Dices detected on a frame, stored as contiguous arrays with one row per
+        dice. Unlike a list of Dices holding views on their frame, a result holds
+        no reference to the frame, so results can be kept for history, tracking
+        or logging without keeping the frames alive. Iterating or indexing it
+        gives Dices.
+
+        Args:
+            bboxes (ndarray): Bounding boxes (top, left, bottom, right), int32 (n, 4)
+            centroids (ndarray): Centers (row, col), float32 (n, 2)
+            areas (ndarray): Number of pixels of each dice, int32 (n,)
+            values (ndarray): Value of each dice, int8 (n,)
+            crops (list[ndarray], optional): Copy of each dice's bounding box.
+                Defaults to None.
+        """
+        self.bboxes = bboxes
+        self.centroids = centroids
+        self.areas = areas
+        self.values = values
+        self.crops = crops
+
+    @classmethod
+    def from_lists(cls, bboxes, centroids, areas, values, frame=None):
+        """Builds a result from per-dice sequences.
+
+        Args:
+            bboxes (list[tupple(int)]): Bounding boxes
+            centroids (list[tupple(float)]): Centers
+            areas (list[int]): Areas
+            values (list[int]): Values
+            frame (ndarray, optional): Frame the crops are copied from.
+                Defaults to None, no crop.
+
+        Returns:
+            DetectionResult: Result
+        """
+        bboxes = np.array(bboxes, dtype=np.int32).reshape(-1, 4)
+        crops = None
+        if frame is not None:
+            crops = [frame[t:b, l:r].copy() for t, l, b, r in bboxes.tolist()]
+        return cls(
+            bboxes,
+            np.array(centroids, dtype=np.float32).reshape(-1, 2),
+            np.array(areas, dtype=np.int32),
+            np.array(values, dtype=np.int8),
+            crops,
+        )
+
+    @classmethod
+    def from_regions(cls, regions, values, frame=None):
+        """Builds a result from segmented regions, see from_lists.
+
+        Args:
+            regions (list[Region]): Regions of the dices
+            values (list[int]): Value of each dice
+            frame (ndarray, optional): Frame the crops are copied from.
+                Defaults to None.
+
+        Returns:
+            DetectionResult: Result
+        """
+        return cls.from_lists(
+            [r.bbox for r in regions],
+            [r.centroid for r in regions],
+            [r.area for r in regions],
+            values,
+            frame,
+        )
+
+    @classmethod
+    def from_dices(cls, obj_lst):
+        """Builds a result from a list of Dices, their areas being unknown (0).
+
+        Returns:
+            DetectionResult: Result
+        """
+        if isinstance(obj_lst, cls):
+            return obj_lst
+        return cls.from_lists(
+            [d.bbox for d in obj_lst],
+            [d.center for d in obj_lst],
+            [0] * len(obj_lst),
+            [-1 if d.value is None else d.value for d in obj_lst],
+        )
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        dice = Dice(
+            center=tuple(self.centroids[i].tolist()),
+            bbox=tuple(self.bboxes[i].tolist()),
+            value=int(self.values[i]),
+        )
+        if self.crops is not None:
+            dice.img = self.crops[i]
+        return dice
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self):
+        """Returns:
+        int: Bytes held by the arrays and crops
+        """
+        arrays = (self.bboxes, self.centroids, self.areas, self.values)
+        crops = self.crops or ()
+        return sum(a.nbytes for a in arrays) + sum(c.nbytes for c in crops)
 
-def detect_dices(frame):
+
+@timed("ip.detect_dices")
+def detect_dices(frame, backend="skimage", downscale=1, keep_crops=False):
     """Dice detection pipeline.
 
     Args:
         frame (ndarray): Current frame
+        backend (str, optional): Segmentation backend, see segment_frame.
+            Defaults to "skimage".
+        downscale (int, optional): If above 1, the segmentation runs on the frame
+            downscaled by this factor and the pips are counted on full resolution
+            crops, see detect_dices_pyramid. Defaults to 1.
+        keep_crops (bool, optional): Copies the crop of each dice into the
+            result. Defaults to False.
 
     Returns:
-        lst[Dice]: list of Dices found on the frame
+        DetectionResult: Dices found on the frame
     """
-    gray = rgb2gray_uint8(frame)
-    norm = normalize_uint8(gray)
-    bin = otsu_uint8(norm)
-    cleared = clear_border(bin)
-    label_image = label(cleared)
+    if downscale > 1:
+        return detect_dices_pyramid(frame, backend, downscale, keep_crops)
 
-    obj_lst = []
-    for region in regionprops(label_image):
-        if region.area >= 100:
-            obj_lst.append(
-                Dice(
-                    in_img=frame,
-                    center=region.centroid,
-                    bbox=region.bbox,
-                    value=None,
-                )
+    _, _, _, label_image, regions = segment_frame(frame, backend)
+    regions = [r for r in regions if r.area >= min_dice_area(frame.shape)]
+    values = count_pips(label_image, regions)
+
+    return DetectionResult.from_regions(regions, values, frame if keep_crops else None)
+
+
+def detect_dices_pyramid(frame, backend="skimage", downscale=2, keep_crops=False):
+    """Dice detection pipeline segmenting a downscaled frame. The bounding boxes
+    found are mapped back to full resolution, where each dice's crop is thresholded
+    at the gray level of the downscaled segmentation to refine its bounding box and
+    count its pips. The cost thus scales with the number of dices rather than with
+    the resolution of the camera.
+
+    Args:
+        frame (ndarray): Current frame
+        backend (str, optional): Segmentation backend, see segment_frame.
+            Defaults to "skimage".
+        downscale (int, optional): Downscaling factor. Defaults to 2.
+        keep_crops (bool, optional): Copies the crop of each dice into the
+            result. Defaults to False.
+
+    Returns:
+        DetectionResult: Dices found on the frame
+    """
+    h, w = frame.shape[:2]
+    small = cv2.resize(
+        frame, (w // downscale, h // downscale), interpolation=cv2.INTER_LINEAR
+    )
+    gray, _, bin, label_image, regions = segment_frame(small, backend)
+    regions = [r for r in regions if r.area >= min_dice_area(small.shape)]
+    threshold = gray_threshold(gray, bin)
+
+    # Margin around the mapped bounding boxes so that the dices don't touch the
+    # border of their full resolution crop
+    pad = 2 * downscale
+
+    bboxes, centers, areas, values = [], [], [], []
+    for region in regions:
+        top = max(0, region.bbox[0] * downscale - pad)
+        left = max(0, region.bbox[1] * downscale - pad)
+        bottom = min(h, region.bbox[2] * downscale + pad)
+        right = min(w, region.bbox[3] * downscale + pad)
+
+        crop_gray = rgb2gray_uint8_cv(frame[top:bottom, left:right])
+        _, crop_bin = cv2.threshold(crop_gray, threshold, 255, cv2.THRESH_BINARY)
+        crop_labels, crop_regions = label_cleared_cv(crop_bin)
+
+        if crop_regions:
+            r = max(crop_regions, key=lambda r: r.area)
+            value = count_pips(crop_labels, [r])[0]
+            bbox = (
+                r.bbox[0] + top,
+                r.bbox[1] + left,
+                r.bbox[2] + top,
+                r.bbox[3] + left,
             )
+            center = (r.centroid[0] + top, r.centroid[1] + left)
+            area = r.area
+        else:
+            # The dice touches its crop border, keep the downscaled detection
+            value = count_pips(label_image, [region])[0]
+            bbox = tuple(v * downscale for v in region.bbox)
+            center = tuple(v * downscale for v in region.centroid)
+            area = region.area * downscale * downscale
 
-    return obj_lst
+        bboxes.append(bbox)
+        centers.append(center)
+        areas.append(area)
+        values.append(value)
 
+    return DetectionResult.from_lists(
+        bboxes, centers, areas, values, frame if keep_crops else None
+    )
 
-def dices_bboxes_overlay(frame, obj_lst):
+
+@timed("ip.dices_bboxes_overlay")
+def dices_bboxes_overlay(frame, obj_lst, out=None):
     """Generates an overaly displaying the bounding box and value of
     each dice detected on the current frame.
 
+    Only the pixels of the bounding boxes are blended, which gives the same result
+    as blending the full frame with each dice's bbox mask.
+
     Args:
         frame (ndarray): Current frame
-        obj_lst (list[Dice]): List of dices detected on the frame
+        obj_lst (DetectionResult or list[Dice]): Dices detected on the frame
+        out (ndarray, optional): Preallocated output image, overwritten with the
+            frame. Defaults to None.
 
     Returns:
         ndarray: Ouput image
     """
-    if len(obj_lst) == 0:
+    if out is None:
         overlayed = frame.copy()
     else:
-        for i, obj in enumerate(obj_lst):
-            if i == 0:
-                overlayed = cv2.addWeighted(
-                    src1=frame,
-                    alpha=1,
-                    src2=obj.get_bbox_mask(frame),
-                    beta=0.5,
-                    gamma=0,
-                )
-            else:
-                overlayed = cv2.addWeighted(
-                    src1=overlayed,
-                    alpha=1,
-                    src2=obj.get_bbox_mask(frame),
-                    beta=0.5,
-                    gamma=0,
-                )
-
-            cv2.putText(
-                img=overlayed,
-                text=str(obj.value),
-                org=(obj.bbox[1], obj.bbox[0] - 10),
-                fontFace=cv2.FONT_HERSHEY_SIMPLEX,
-                fontScale=0.75,
-                color=(0, 0, 255),
-                thickness=1,
-                bottomLeftOrigin=False,
-            )
+        overlayed = out
+        np.copyto(overlayed, frame)
+
+    result = DetectionResult.from_dices(obj_lst)
+    half_color = 0.5 * np.asarray(Dice.bbox_color, dtype=np.float32)
+    for bbox, value in zip(result.bboxes.tolist(), result.values.tolist()):
+        for edge in bbox_edges(bbox):
+            blended = np.rint(overlayed[edge] + half_color)
+            overlayed[edge] = np.minimum(blended, 255)
+
+        cv2.putText(
+            img=overlayed,
+            text=str(value),
+            org=(bbox[1], bbox[0] - 10),
+            fontFace=cv2.FONT_HERSHEY_SIMPLEX,
+            fontScale=0.75,
+            color=(0, 0, 255),
+            thickness=1,
+            bottomLeftOrigin=False,
+        )
 
     return overlayed
+
+
+class OverlayRenderer:
+    def __init__(self):
+        """Renders the dices overlay into a buffer allocated once and reused for
+        every frame of the same shape. The returned image is overwritten by the
+        next call to render."""
+        self.buffer = None
+
+    def render(self, frame, obj_lst):
+        """Generates the overlay of the dices detected on the current frame.
+
+        Args:
+            frame (ndarray): Current frame
+            obj_lst (DetectionResult or list[Dice]): Dices detected on the frame
+
+        Returns:
+            ndarray: Ouput image
+        """
+        if (
+            self.buffer is None
+            or self.buffer.shape != frame.shape
+            or self.buffer.dtype != frame.dtype
+        ):
+            self.buffer = np.empty_like(frame)
+
+        return dices_bboxes_overlay(frame, obj_lst, out=self.buffer)
+
+
+# label2rgb's default colors, in BGR order
+LABEL_COLORS = (
+    (0, 0, 255),
+    (255, 0, 0),
+    (0, 255, 255),
+    (255, 0, 255),
+    (0, 128, 0),
+    (130, 0, 75),
+    (0, 140, 255),
+    (255, 255, 0),
+    (203, 192, 255),
+    (50, 205, 154),
+)
+
+
+class LabelColorizer:
+    def __init__(self, alpha=0.3, colors=LABEL_COLORS):
+        """Fast replacement for skimage's label2rgb overlay. Label ids index a
+        precomputed color lookup table and the colors are blended with the frame
+        in uint8, the background keeping the frame's pixels.
+
+        Args:
+            alpha (float, optional): Opacity of the colors. Defaults to 0.3.
+            colors (tupple, optional): BGR colors cycled through the labels.
+                Defaults to LABEL_COLORS.
+        """
+        self.alpha = alpha
+        self.colors = np.asarray(colors, dtype=np.uint8)
+        self.lut = np.zeros((1, 3), dtype=np.uint8)
+        self.color_image = None
+        self.buffer = None
+
+    def _grow_lut(self, max_label):
+        """Extends the lookup table to cover labels up to max_label.
+
+        Args:
+            max_label (int): Highest label id
+        """
+        n = max(max_label + 1, 2 * len(self.lut))
+        idx = np.arange(len(self.lut), n)
+        self.lut = np.concatenate([self.lut, self.colors[(idx - 1) % len(self.colors)]])
+
+    def render(self, frame, label_image):
+        """Generates the overlay of the labels on the frame. The returned image is
+        overwritten by the next call to render.
+
+        Args:
+            frame (ndarray): Current frame
+            label_image (ndarray): Label image of the frame
+
+        Returns:
+            ndarray: Ouput image
+        """
+        if self.buffer is None or self.buffer.shape != frame.shape:
+            self.color_image = np.empty_like(frame)
+            self.buffer = np.empty_like(frame)
+
+        max_label = int(label_image.max())
+        if max_label >= len(self.lut):
+            self._grow_lut(max_label)
+
+        np.take(self.lut, label_image, axis=0, out=self.color_image)
+        cv2.addWeighted(
+            frame, 1 - self.alpha, self.color_image, self.alpha, 0, dst=self.buffer
+        )
+        background = (label_image == 0).view(np.uint8)
+        cv2.copyTo(frame, background, self.buffer)
+
+        return self.buffer
+
+
+class MosaicCompositor:
+    def __init__(self, layout=(2, 3), target_size=None):
+        """Assembles panels of the same size on a grid. The canvas is allocated once
+        and every panel is written in place in its cell, single-channel panels being
+        expanded to 3 channels directly into their cell without stacked copies.
+
+        Args:
+            layout (tupple(int), optional): Number of rows and columns of the grid.
+                Defaults to (2, 3).
+            target_size (tupple(int), optional): Maximum (width, height) of the
+                mosaic, panels are downscaled to fit. Defaults to None.
+        """
+        self.layout = layout
+        self.target_size = target_size
+        self.panel_shape = None
+        self.cell_shape = None
+        self.canvas = None
+        self.gray_cell = None
+
+    def _allocate(self, panel_shape):
+        """Allocates the canvas for panels of a given shape.
+
+        Args:
+            panel_shape (tupple(int)): Shape of the panels
+        """
+        rows, cols = self.layout
+        h, w = panel_shape[:2]
+        scale = 1.0
+        if self.target_size is not None:
+            scale = min(1.0, self.target_size[0] / (cols * w))
+            scale = min(scale, self.target_size[1] / (rows * h))
+
+        self.panel_shape = panel_shape[:2]
+        self.cell_shape = (max(1, int(h * scale)), max(1, int(w * scale)))
+        ch, cw = self.cell_shape
+        self.canvas = np.zeros((rows * ch, cols * cw, 3), dtype=np.uint8)
+        self.gray_cell = np.empty((ch, cw), dtype=np.uint8)
+
+    def compose(self, panels):
+        """Writes the panels on the canvas, row by row. The returned image is
+        overwritten by the next call to compose.
+
+        Args:
+            panels (list[ndarray]): 8bit panels, grayscale or BGR, all of the same
+                size. None leaves a cell untouched.
+
+        Returns:
+            ndarray: Mosaic
+        """
+        rows, cols = self.layout
+        assert len(panels) <= rows * cols, "ERROR: more panels than cells"
+
+        shape = next(p.shape for p in panels if p is not None)
+        if self.canvas is None or self.panel_shape != shape[:2]:
+            self._allocate(shape)
+
+        ch, cw = self.cell_shape
+        resize = self.cell_shape != self.panel_shape
+        for i, panel in enumerate(panels):
+            if panel is None:
+                continue
+            r, c = divmod(i, cols)
+            cell = self.canvas[r * ch : (r + 1) * ch, c * cw : (c + 1) * cw]
+
+            if panel.ndim == 2:
+                if resize:
+                    panel = cv2.resize(
+                        panel,
+                        (cw, ch),
+                        dst=self.gray_cell,
+                        interpolation=cv2.INTER_AREA,
+                    )
+                cv2.cvtColor(panel, cv2.COLOR_GRAY2BGR, dst=cell)
+            elif resize:
+                cv2.resize(panel, (cw, ch), dst=cell, interpolation=cv2.INTER_AREA)
+            else:
+                np.copyto(cell, panel)
+
+        return self.canvas
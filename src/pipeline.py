@@ -0,0 +1,192 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from src.ip import detect_dices, OverlayRenderer
+
+
+class StageTimer:
+    def __init__(self, window=120):
+        """Keeps the latencies of the last frames handled by a pipeline stage.
+
+        Args:
+            window (int, optional): Number of latencies kept. Defaults to 120.
+        """
+        self.latencies = deque(maxlen=window)
+        self.timestamps = deque(maxlen=window)
+
+    def add(self, latency):
+        """Records the latency of a frame.
+
+        Args:
+            latency (float): Latency in seconds
+        """
+        self.latencies.append(latency)
+        self.timestamps.append(time.perf_counter())
+
+    def mean_ms(self):
+        """Returns:
+        float: Mean latency over the window in milliseconds
+        """
+        if not self.latencies:
+            return 0.0
+        return 1000 * sum(self.latencies) / len(self.latencies)
+
+    def fps(self):
+        """Returns:
+        float: Rate at which frames went through the stage over the window
+        """
+        if len(self.timestamps) < 2:
+            return 0.0
+        return (len(self.timestamps) - 1) / (self.timestamps[-1] - self.timestamps[0])
+
+
+class FramePipeline:
+    def __init__(
+        self,
+        cap,
+        process=detect_dices,
+        render=None,
+        queue_size=2,
+        window_name="",
+    ):
+        """Runs capture, processing and display of a camera feed as a pipeline.
+        A capture thread fills a bounded queue dropping the oldest frames, a
+        worker thread processes them and the display, on the calling thread,
+        always shows the newest result. NumPy, OpenCV and skimage release the GIL
+        in their heavy calls so the stages overlap on multi-core machines.
+
+        Args:
+            cap (cv2.VideoCapture): Opened camera
+            process (callable, optional): Called on each frame, returns a result.
+                Defaults to detect_dices.
+            render (callable, optional): Called with the frame and its result,
+                returns the image to display. Defaults to OverlayRenderer.render.
+            queue_size (int, optional): Number of captured frames waiting to be
+                processed. Defaults to 2.
+            window_name (str, optional): Name of the display window. Defaults to "".
+        """
+        self.cap = cap
+        self.process = process
+        self.render = render if render is not None else OverlayRenderer().render
+        self.window_name = window_name
+
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.latest = None  # (sequence number, capture time, frame, result)
+        self.nb_dropped = 0
+
+        self.timers = {
+            "capture": StageTimer(),
+            "process": StageTimer(),
+            "display": StageTimer(),
+            "end_to_end": StageTimer(),
+        }
+
+        self.threads = [
+            threading.Thread(target=self._capture_loop, daemon=True),
+            threading.Thread(target=self._process_loop, daemon=True),
+        ]
+
+    def _capture_loop(self):
+        """Reads frames from the camera and queues them, dropping the oldest
+        frame when the processing stage lags behind."""
+        while not self.stop_event.is_set():
+            t0 = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                self.stop_event.set()
+                break
+            self.timers["capture"].add(time.perf_counter() - t0)
+
+            while True:
+                try:
+                    self.frames.put_nowait((t0, frame))
+                    break
+                except queue.Full:
+                    try:
+                        self.frames.get_nowait()
+                        self.nb_dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def _process_loop(self):
+        """Processes queued frames and publishes the newest result."""
+        seq = 0
+        while not self.stop_event.is_set():
+            try:
+                t_capture, frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            t0 = time.perf_counter()
+            result = self.process(frame)
+            self.timers["process"].add(time.perf_counter() - t0)
+
+            seq += 1
+            with self.lock:
+                self.latest = (seq, t_capture, frame, result)
+
+    def report(self):
+        """Returns:
+        str: Per-stage latency and end-to-end frame rate summary
+        """
+        stages = ", ".join(
+            f"{name} {timer.mean_ms():.1f}ms"
+            for name, timer in self.timers.items()
+            if name != "end_to_end"
+        )
+        e2e = self.timers["end_to_end"]
+        return (
+            f"{stages} | end-to-end {e2e.mean_ms():.1f}ms at {e2e.fps():.1f} fps"
+            f" | {self.nb_dropped} frames dropped"
+        )
+
+    def run(self, report_every=5.0):
+        """Starts the capture and processing threads and displays results until
+        'q' is pressed or the camera stops delivering frames.
+
+        Args:
+            report_every (float, optional): Period in seconds at which the stats
+                are printed. Defaults to 5.0.
+        """
+        for t in self.threads:
+            t.start()
+
+        last_seq = 0
+        last_report = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                with self.lock:
+                    latest = self.latest
+
+                if latest is not None and latest[0] != last_seq:
+                    last_seq, t_capture, frame, result = latest
+                    t0 = time.perf_counter()
+                    image = self.render(frame, result)
+                    cv2.imshow(self.window_name, image)
+                    t1 = time.perf_counter()
+                    self.timers["display"].add(t1 - t0)
+                    self.timers["end_to_end"].add(t1 - t_capture)
+
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+
+                if time.perf_counter() - last_report > report_every:
+                    print(self.report())
+                    last_report = time.perf_counter()
+        finally:
+            self.stop()
+
+        print(self.report())
+
+    def stop(self):
+        """Stops the capture and processing threads"""
+        self.stop_event.set()
+        for t in self.threads:
+            if t.is_alive():
+                t.join(timeout=1.0)
@@ -0,0 +1,290 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    def __init__(self, window=1000):
+        """Latencies of a profiled stage, the percentiles being computed over the
+        last calls. Safe to share between threads, such as the stages of a
+        FramePipeline.
+
+        Args:
+            window (int, optional): Number of latencies kept. Defaults to 1000.
+        """
+        self.latencies = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, latency):
+        """Records the latency of a call.
+
+        Args:
+            latency (float): Latency in seconds
+        """
+        with self.lock:
+            self.latencies.append(latency)
+            self.count += 1
+            self.total += latency
+
+    def summary(self):
+        """Returns:
+        dict: Number of calls, total time in seconds, and mean and percentile
+            latencies over the window in milliseconds
+        """
+        with self.lock:
+            ms = 1000 * np.array(self.latencies)
+            count, total = self.count, self.total
+        p50, p95, p99 = np.percentile(ms, (50, 95, 99)) if len(ms) else (0, 0, 0)
+        return {
+            "count": count,
+            "total_s": total,
+            "mean_ms": float(ms.mean()) if len(ms) else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+        }
+
+
+class _NullStage:
+    """Stage returned while profiling is disabled, doing nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Profiler:
+    def __init__(self, window=1000):
+        """Collects the latencies of named stages, timed with the stage context
+        manager or the timed decorator. Disabled by default, in which case both
+        cost a single attribute check.
+
+        Args:
+            window (int, optional): Number of latencies kept per stage for the
+                percentiles. Defaults to 1000.
+        """
+        self.window = window
+        self.enabled = False
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.dump_thread = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forgets all the latencies recorded"""
+        with self.lock:
+            self.stats = {}
+
+    def record(self, name, latency):
+        """Records the latency of a call of a stage.
+
+        Args:
+            name (str): Name of the stage
+            latency (float): Latency in seconds
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            with self.lock:
+                stats = self.stats.setdefault(name, LatencyStats(self.window))
+        stats.add(latency)
+
+    def stage(self, name):
+        """Context manager timing the code it wraps.
+
+        Args:
+            name (str): Name of the stage
+
+        Returns:
+            context manager: Timer, or NULL_STAGE when disabled
+        """
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function.
+
+        Args:
+            name (str, optional): Name of the stage. Defaults to the function's
+                qualified name.
+        """
+
+        def decorator(func):
+            stage_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                t0 = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(stage_name, time.perf_counter() - t0)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self):
+        """Returns:
+        dict[str, dict]: Summary of each stage, see LatencyStats.summary
+        """
+        with self.lock:
+            items = sorted(self.stats.items())
+        return {name: stats.summary() for name, stats in items}
+
+    def dump(self, path):
+        """Writes the summary to a JSON file, or to a CSV file if the path ends
+        with .csv.
+
+        Args:
+            path (str): Output file
+        """
+        summary = self.summary()
+        with open(path, "w", newline="") as f:
+            if path.endswith(".csv"):
+                import csv
+
+                writer = csv.writer(f)
+                writer.writerow(["stage", *LatencyStats().summary()])
+                for name, s in summary.items():
+                    writer.writerow([name, *s.values()])
+            else:
+                json.dump(summary, f, indent=4)
+
+    def dump_every(self, path, period=5.0):
+        """Dumps the summary periodically from a daemon thread.
+
+        Args:
+            path (str): Output file, see dump
+            period (float, optional): Period in seconds. Defaults to 5.0.
+        """
+
+        def loop():
+            while True:
+                time.sleep(period)
+                self.dump(path)
+
+        self.dump_thread = threading.Thread(target=loop, daemon=True)
+        self.dump_thread.start()
+
+    def draw(self, image, org=(10, 20), line_height=18):
+        """Writes the p50/p95/p99 latencies of every stage on an image, for the
+        live display.
+
+        Args:
+            image (ndarray): BGR image, modified in place
+            org (tupple(int), optional): Position of the first line (x, y).
+                Defaults to (10, 20).
+            line_height (int, optional): Spacing of the lines in pixels.
+                Defaults to 18.
+
+        Returns:
+            ndarray: The image
+        """
+        import cv2
+
+        x, y = org
+        for name, s in self.summary().items():
+            text = (
+                f"{name}: {s['p50_ms']:.2f} / {s['p95_ms']:.2f} / "
+                f"{s['p99_ms']:.2f} ms"
+            )
+            cv2.putText(
+                image, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 3
+            )
+            cv2.putText(
+                image, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1
+            )
+            y += line_height
+
+        return image
+
+
+# Profiler shared by the instrumented modules
+PROFILER = Profiler()
+stage = PROFILER.stage
+timed = PROFILER.timed
+
+
+def run_cprofile(func, path, *args, threads=False, **kwargs):
+    """Runs a function under cProfile and writes the stats, to be read with pstats
+    or snakeviz.
+
+    Args:
+        func (callable): Function to run
+        path (str): Output file
+        *args, **kwargs: Arguments of the function
+        threads (bool, optional): Also profiles the threads started by the
+            function, each with its own profiler, the stats of the threads that
+            finished being merged with those of the calling thread.
+            Defaults to False.
+
+    Returns:
+        Result of the function
+    """
+    import cProfile
+    import pstats
+
+    profile = cProfile.Profile()
+    thread_profiles = []
+
+    def start_thread_profile(*_):
+        # Called on the first event of each new thread, the thread's profiler then
+        # replacing this hook
+        thread_profile = cProfile.Profile()
+        try:
+            thread_profile.enable()
+        except ValueError:
+            # Python 3.12+, whose profiler already sees every thread
+            threading.setprofile(None)
+            return
+        thread_profiles.append((threading.current_thread(), thread_profile))
+
+    if threads:
+        threading.setprofile(start_thread_profile)
+    try:
+        return profile.runcall(func, *args, **kwargs)
+    finally:
+        if threads:
+            threading.setprofile(None)
+        stats = pstats.Stats(profile)
+        for thread, thread_profile in thread_profiles:
+            if not thread.is_alive():
+                stats.add(thread_profile)
+        stats.dump_stats(path)
@@ -0,0 +1,354 @@
+import asyncio
+import inspect
+import json
+
+import numpy as np
+
+from src.gameplay import Bid, Game, Player, ProbabilisticCpuPlayer
+
+
+def encode(msg):
+    """Returns:
+    bytes: Message as a line of JSON
+    """
+    return (json.dumps(msg) + "\n").encode()
+
+
+def parse_answer(line):
+    """Parses the answer of a client, either a JSON object or plain text, "y"/"n"
+    to a challenge prompt and "count value" to a bid prompt, so that a terminal
+    client like netcat can play.
+
+    Args:
+        line (bytes): Line received
+
+    Returns:
+        dict: Answer, with a "challenge" or a "bid" key
+    """
+    text = line.decode(errors="replace").strip()
+    if text.startswith("{"):
+        try:
+            answer = json.loads(text)
+        except json.JSONDecodeError:
+            return {}
+        return answer if isinstance(answer, dict) else {}
+    if text in ("y", "n"):
+        return {"challenge": text == "y"}
+    parts = text.split()
+    if len(parts) == 2 and all(part.isdigit() for part in parts):
+        return {"bid": [int(parts[0]), int(parts[1])]}
+    return {}
+
+
+def smallest_raise(last_bid):
+    """Returns:
+    tupple(int, int): Count and value of the smallest bid raising the last one
+    """
+    if last_bid.bidder is None:
+        return 1, 1
+    if last_bid.value < 6:
+        return last_bid.count, last_bid.value + 1
+    return last_bid.count + 1, 6
+
+
+class RemotePlayer(Player):
+    __slots__ = ("reader", "writer", "timeout", "outbox")
+
+    def __init__(self, name, nb_dices, reader, writer, timeout=30.0, rng=None):
+        """Human player connected to the server. Messages are sent as JSON lines and
+        its actions are awaited from the connection, with a deadline per action.
+        Missing the deadline doesn't challenge, and places the smallest raise.
+        Messages are queued and sent together when the player is prompted or the
+        table pauses, saving a system call per message.
+
+        Args:
+            name (str): Player's name
+            nb_dices (int): Player's initial number of dices
+            reader (asyncio.StreamReader): Connection to the client
+            writer (asyncio.StreamWriter): Connection to the client
+            timeout (float, optional): Seconds given for each action.
+                Defaults to 30.0.
+            rng (np.random.Generator, optional): Random generator of the player.
+                Defaults to a freshly seeded one.
+        """
+        super().__init__(name, nb_dices, headless=False, rng=rng)
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.outbox = []
+
+    def send(self, msg):
+        """Queues a message to the client"""
+        self.outbox.append(encode(msg))
+
+    def flush(self):
+        """Writes the queued messages, without waiting for them to be sent"""
+        if self.outbox:
+            self.writer.write(b"".join(self.outbox))
+            self.outbox.clear()
+
+    def say(self, *args):
+        self.send({"type": "say", "text": " ".join(str(a) for a in args)})
+
+    def pause(self, seconds):
+        pass  # pacing is done by the table, without blocking the event loop
+
+    def disclose_dices(self):
+        self.send({"type": "roll", "dices": self.dices_values.tolist()})
+
+    async def ask(self, msg, deadline):
+        """Sends a prompt and waits for the answer.
+
+        Args:
+            msg (dict): Prompt
+            deadline (float): Event loop time at which the action times out
+
+        Returns:
+            dict: Answer, None if the deadline passed
+        """
+        loop = asyncio.get_running_loop()
+        msg["timeout"] = round(max(deadline - loop.time(), 0.0), 3)
+        self.send(msg)
+        self.flush()
+        await self.writer.drain()
+        try:
+            line = await asyncio.wait_for(
+                self.reader.readline(), max(deadline - loop.time(), 0.0)
+            )
+        except asyncio.TimeoutError:
+            return None
+        if not line:
+            raise ConnectionError(f"{self.name} disconnected")
+        return parse_answer(line)
+
+    async def challenge_last_bid(self, last_bid, total_nb_dice):
+        """Asks the client if they challenge the last bid.
+
+        Args:
+            last_bid (object Bid): Last bid
+            total_nb_dice (int): Total number of dices in the game
+
+        Returns:
+            object Bid: Updated last bid
+        """
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        while True:
+            answer = await self.ask(
+                {"type": "challenge", "bid": [last_bid.count, last_bid.value]},
+                deadline,
+            )
+            if answer is None:
+                break
+            if isinstance(answer.get("challenge"), bool):
+                if answer["challenge"]:
+                    last_bid.challenger = self.player_id
+                break
+            self.say("   Invalid input: should be 'y' or 'n'")
+        return last_bid
+
+    async def place_bid(self, last_bid, total_nb_dice):
+        """Asks the client for a bid raising the last one.
+
+        Args:
+            last_bid (object Bid): Last bid
+            total_nb_dice (int): Total number of dices in the game
+
+        Returns:
+            object Bid: Updated last bid
+        """
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        while True:
+            answer = await self.ask(
+                {"type": "bid", "last": [last_bid.count, last_bid.value]}, deadline
+            )
+            if answer is None:
+                return Bid(self.player_id, *smallest_raise(last_bid))
+            try:
+                count, value = (int(x) for x in answer["bid"])
+            except (KeyError, TypeError, ValueError):
+                self.say("   Invalid input: should be two integers")
+                continue
+            bid = Bid(self.player_id, count, value)
+            if count >= 1 and 1 <= value <= 6 and bid.raises(last_bid):
+                return bid
+            self.say("   Invalid input: You have to raise the bid!")
+
+
+class AsyncGame(Game):
+    __slots__ = ("pace",)
+
+    def __init__(
+        self,
+        player,
+        nb_cpus,
+        nb_dices,
+        cpu_player_cls=ProbabilisticCpuPlayer,
+        rng=None,
+        pace=0.5,
+    ):
+        """Game played by a RemotePlayer against cpu players, as a coroutine. The
+        game's messages are sent to the remote player instead of being printed,
+        and pauses are awaited.
+
+        Args:
+            player (RemotePlayer): Human player's seat
+            nb_cpus (int): Number of computer-controlled oponents
+            nb_dices (int): Initial number of dices for each player
+            cpu_player_cls (type or list[type], optional): Class of the
+                computer-controlled oponents. Defaults to ProbabilisticCpuPlayer.
+            rng (np.random.Generator, optional): Random generator shared by the
+                computer-controlled oponents. Defaults to a freshly seeded one.
+            pace (float, optional): Seconds between actions of the cpu players.
+                Defaults to 0.5.
+        """
+        self.pace = pace
+        super().__init__(
+            None,
+            nb_cpus,
+            nb_dices,
+            headless=True,
+            human_player=player,
+            cpu_player_cls=cpu_player_cls,
+            rng=rng,
+        )
+
+    def say(self, *args):
+        self.human_player.say(*args)
+
+    def end_round(self, last_bid):
+        """Reveals all the dices to the remote player, then ends the round, see
+        Game.end_round"""
+        self.human_player.send(
+            {
+                "type": "reveal",
+                "dices": {p.name: p.dices_values.tolist() for p in self.all_players},
+            }
+        )
+        return super().end_round(last_bid)
+
+    async def act(self, action, last_bid):
+        """Runs a player action, awaiting it if it is a coroutine"""
+        res = action(last_bid, self.total_nb_dice)
+        if inspect.isawaitable(res):
+            return await res
+        if self.pace:
+            self.human_player.flush()
+        await asyncio.sleep(self.pace)
+        return res
+
+    async def play_bid_round(self):
+        """Plays a round of bidding, see Game.play_bid_round
+
+        Returns:
+            object Bid: Last bid made in the round
+        """
+        bid_round = 0
+        last_bid = Bid(None, 0, 1)
+
+        while True:
+            for i, p in enumerate(self.all_players):
+                if (i > 0) or (bid_round > 0):
+                    last_bid = await self.act(p.challenge_last_bid, last_bid)
+                    if last_bid.challenger is not None:
+                        break
+                last_bid = await self.act(p.place_bid, last_bid)
+                self.say(f"{p.name} bid {last_bid.count} {last_bid.value}")
+
+            if last_bid.challenger is not None:
+                break
+
+            bid_round += 1
+
+        return last_bid
+
+    async def play(self, until_last_standing=False):
+        """Plays the game, see Game.play
+
+        Returns:
+            object Player: The human player's seat if it won, or the last player
+                standing, None otherwise
+        """
+        while True:
+            self.start_round()
+            last_bid = await self.play_bid_round()
+            looser = self.end_round(last_bid)
+            if looser is not self.human_player:
+                self.say(f"{looser.name} lost a dice")
+            over, winner = self.remove_looser_dice(looser, until_last_standing)
+            if over:
+                return winner
+            if self.pace:
+                self.human_player.flush()
+            await asyncio.sleep(self.pace)
+
+
+class GameServer:
+    def __init__(
+        self,
+        nb_dices=3,
+        max_cpus=4,
+        cpu_player_cls=ProbabilisticCpuPlayer,
+        pace=0.5,
+        action_timeout=30.0,
+        seed=None,
+    ):
+        """Hosts games over TCP, one table per connection, each played by its own
+        task. The client sends {"type": "join", "name": ..., "cpus": ...} as a
+        JSON line, then answers the "challenge" and "bid" prompts of the table.
+
+        Args:
+            nb_dices (int, optional): Initial number of dices for each player.
+                Defaults to 3.
+            max_cpus (int, optional): Largest number of oponents. Defaults to 4.
+            cpu_player_cls (type, optional): Class of the computer-controlled
+                oponents. Defaults to ProbabilisticCpuPlayer.
+            pace (float, optional): Seconds between actions of the cpu players.
+                Defaults to 0.5.
+            action_timeout (float, optional): Seconds given to the human players
+                for each action. Defaults to 30.0.
+            seed (int, optional): Seed of the random generator. Defaults to None.
+        """
+        self.nb_dices = nb_dices
+        self.max_cpus = max_cpus
+        self.cpu_player_cls = cpu_player_cls
+        self.pace = pace
+        self.action_timeout = action_timeout
+        self.rng = np.random.default_rng(seed)
+        self.tables = set()
+        self.games_played = 0
+
+    async def handle(self, reader, writer):
+        """Plays the game of a connection"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.action_timeout)
+            join = json.loads(line)
+            nb_cpus = min(max(int(join.get("cpus", 1)), 1), self.max_cpus)
+            name = str(join.get("name", "Player"))[:32]
+        except (asyncio.TimeoutError, ValueError, TypeError, AttributeError):
+            writer.close()
+            return
+
+        player = RemotePlayer(
+            name, self.nb_dices, reader, writer, self.action_timeout, self.rng
+        )
+        game = AsyncGame(
+            player, nb_cpus, self.nb_dices, self.cpu_player_cls, self.rng, self.pace
+        )
+        self.tables.add(game)
+        try:
+            winner = await game.play()
+            player.send({"type": "end", "winner": winner and winner.name})
+            player.flush()
+            await writer.drain()
+            self.games_played += 1
+        except ConnectionError:
+            pass
+        finally:
+            self.tables.discard(game)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        """Accepts connections until cancelled"""
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,157 @@
+import functools
+
+import numpy as np
+
+
+@functools.lru_cache(maxsize=None)
+def _next_seat_table(nb_seats):
+    """Next seat still in the game for every pattern of alive seats.
+
+    Args:
+        nb_seats (int): Number of seats
+
+    Returns:
+        ndarray: Array (2**nb_seats x seats), the pattern's bit i being seat i alive
+    """
+    table = np.zeros((2**nb_seats, nb_seats), dtype=np.int16)
+    for pattern in range(2**nb_seats):
+        for seat in range(nb_seats):
+            for k in range(1, nb_seats + 1):
+                cand = (seat + k) % nb_seats
+                if pattern >> cand & 1:
+                    table[pattern, seat] = cand
+                    break
+
+    return table
+
+
+def next_alive_seats(alive):
+    """Finds, for each game and seat, the first following seat still in the game.
+
+    Args:
+        alive (ndarray): Boolean array (games x seats) of the players still in
+
+    Returns:
+        ndarray: Array (games x seats) of the next seats
+    """
+    nb_seats = alive.shape[1]
+    pattern = alive @ (1 << np.arange(nb_seats))
+    return _next_seat_table(nb_seats)[pattern]
+
+
+def play_bid_rounds(starter, next_seat, total, rng, challenge_p=0.1, raise_count_p=0.5):
+    """Plays the bidding of one round for every game at once, with the rules of
+    CpuPlayer: the starter bids 2-4 of a random value, then each player challenges
+    with probability challenge_p (or if the count exceeds the number of dices in
+    play), otherwise raises the count or the value.
+
+    Args:
+        starter (ndarray): Seat starting the round in each game
+        next_seat (ndarray): Next seat still in the game, see next_alive_seats
+        total (ndarray): Number of dices in play in each game
+        rng (np.random.Generator): Random generator
+        challenge_p (float, optional): Probability to challenge. Defaults to 0.1.
+        raise_count_p (float, optional): Probability to raise the count rather
+            than the value. Defaults to 0.5.
+
+    Returns:
+        tuple(ndarray): Count, value, bidder and challenger of each game's last bid
+    """
+    n = len(starter)
+    out_count = np.empty(n, dtype=np.int16)
+    out_value = np.empty(n, dtype=np.int16)
+    out_bidder = np.empty(n, dtype=np.int16)
+    out_challenger = np.empty(n, dtype=np.int16)
+
+    # State of the games still bidding, compacted at every turn
+    pos = np.arange(n)
+    count = rng.integers(2, 5, size=n, dtype=np.int16)
+    value = rng.integers(1, 7, size=n, dtype=np.int16)
+    bidder = starter.astype(np.int16)
+    total = total.astype(np.int16)
+    while len(pos):
+        actor = next_seat[pos, bidder]
+
+        challenge = (rng.random(len(pos)) < challenge_p) | (count > total)
+        done = pos[challenge]
+        out_count[done] = count[challenge]
+        out_value[done] = value[challenge]
+        out_bidder[done] = bidder[challenge]
+        out_challenger[done] = actor[challenge]
+
+        raising = ~challenge
+        pos, count, value, total = (
+            pos[raising],
+            count[raising],
+            value[raising],
+            total[raising],
+        )
+        bidder = actor[raising]
+        up_count = (value == 6) | (rng.random(len(pos)) < raise_count_p)
+        count += up_count
+        value += ~up_count
+
+    return out_count, out_value, out_bidder, out_challenger
+
+
+def simulate_games(nb_games, nb_cpus, nb_dices, seed=None, **bid_kwargs):
+    """Simulates independent games of CpuPlayers with NumPy, every game being a row
+    of the state arrays. Follows the rules of Game.play: the looser of a round
+    loses a dice and starts the next one, players are eliminated at zero dices and
+    the game ends when seat 0 (the human player's seat) is eliminated or is the
+    last one standing.
+
+    Args:
+        nb_games (int): Number of games
+        nb_cpus (int): Number of players besides seat 0
+        nb_dices (int): Initial number of dices for each player
+        seed (int, optional): Seed of the random generator. Defaults to None.
+        **bid_kwargs: Probabilities passed to play_bid_rounds
+
+    Returns:
+        tuple(ndarray): Whether seat 0 won, and number of rounds of each game
+    """
+    rng = np.random.default_rng(seed)
+    nb_seats = nb_cpus + 1
+
+    seat0_won = np.zeros(nb_games, dtype=bool)
+    nb_rounds = np.zeros(nb_games, dtype=np.int64)
+
+    # State of the games still running, their ids index the outputs
+    ids = np.arange(nb_games)
+    dices_left = np.full((nb_games, nb_seats), nb_dices, dtype=np.int16)
+    starter = np.zeros(nb_games, dtype=np.int16)
+    slots = np.arange(nb_dices)
+
+    while len(ids):
+        n = len(ids)
+        rows = np.arange(n)
+        total = dices_left.sum(axis=1)
+        next_seat = next_alive_seats(dices_left > 0)
+
+        dices = rng.integers(1, 7, size=(n, nb_seats, nb_dices), dtype=np.int8)
+        in_play = slots < dices_left[:, :, None]
+
+        count, value, bidder, challenger = play_bid_rounds(
+            starter, next_seat, total, rng, **bid_kwargs
+        )
+
+        matches = (dices == value[:, None, None]) & in_play
+        bid_valid = matches.sum(axis=(1, 2)) == count
+        looser = np.where(bid_valid, challenger, bidder)
+
+        dices_left[rows, looser] -= 1
+        nb_rounds[ids] += 1
+
+        # the looser starts the next round, or the next player if eliminated
+        alive = dices_left > 0
+        starter = np.where(alive[rows, looser], looser, next_seat[rows, looser])
+
+        seat0_out = ~alive[:, 0]
+        others_out = ~alive[:, 1:].any(axis=1)
+        seat0_won[ids[others_out & ~seat0_out]] = True
+
+        keep = ~(seat0_out | others_out)
+        ids, dices_left, starter = ids[keep], dices_left[keep], starter[keep]
+
+    return seat0_won, nb_rounds
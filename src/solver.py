@@ -0,0 +1,477 @@
+import functools
+import itertools
+import json
+import math
+import struct
+
+import numpy as np
+
+from src.gameplay import Bid, ProbabilisticCpuPlayer
+
+MAGIC = b"LDPOLICY"
+
+
+@functools.lru_cache(maxsize=None)
+def roll_multisets(nb_dices):
+    """Enumerates the distinct rolls of nb_dices dices regardless of the dices
+    order, as histograms of the values.
+
+    Args:
+        nb_dices (int): Number of dices
+
+    Returns:
+        tuple(ndarray, ndarray): Histograms (rolls x 6) of the values 1 to 6 and
+            probability of each roll
+    """
+    hists, probs = [], []
+    for roll in itertools.combinations_with_replacement(range(6), nb_dices):
+        hist = np.bincount(roll, minlength=6)
+        nb_orders = math.factorial(nb_dices)
+        for h in hist:
+            nb_orders //= math.factorial(h)
+        hists.append(hist)
+        probs.append(nb_orders / 6**nb_dices)
+
+    return np.array(hists, dtype=np.int16).reshape(-1, 6), np.array(probs)
+
+
+@functools.lru_cache(maxsize=None)
+def roll_index(nb_dices):
+    """Returns:
+    dict[tupple(int), int]: Index of each histogram returned by roll_multisets
+    """
+    hists, _ = roll_multisets(nb_dices)
+    return {tuple(int(c) for c in h): i for i, h in enumerate(hists)}
+
+
+def bid_code(count, value):
+    """Index of a bid, ordered by count then value.
+
+    Args:
+        count (int): Count of the bid, from 1
+        value (int): Value of the bid, from 1 to 6
+
+    Returns:
+        int: Index of the bid
+    """
+    return (count - 1) * 6 + value - 1
+
+
+def table_configs(nb_players, nb_dices):
+    """Lists the tables of up to nb_players players with up to nb_dices dices each,
+    i.e. every table reachable during a game starting with these settings.
+
+    Args:
+        nb_players (int): Number of players at the start of the game
+        nb_dices (int): Initial number of dices for each player
+
+    Returns:
+        list[tupple(int)]: Number of dices of each seat, seat 0 starting the round
+    """
+    return [
+        dices
+        for n in range(2, nb_players + 1)
+        for dices in itertools.product(range(1, nb_dices + 1), repeat=n)
+    ]
+
+
+class RoundSolver:
+    def __init__(self, dices, max_rolls=50000):
+        """Solves the bidding round of a table with counterfactual regret
+        minimization (CFR+).
+
+        An information set is the roll of the player to act, as a multiset, with
+        the last bid and the seat that placed it. The bids being ordered, a bid
+        only depends on the round through these, so the bidding tree collapses to
+        a DAG of (last bid, bidder) states shared by all histories, which is the
+        transposition table. Every joint roll of the table is evaluated at once
+        as a row of the value and reach arrays.
+
+        A player looses the round when challenged on an invalid bid or when
+        challenging a valid one, following Game.check_bid, a bid being valid if
+        the count is exact.
+
+        Args:
+            dices (tupple(int)): Number of dices of each seat, seat 0 starting
+            max_rolls (int, optional): Largest number of joint rolls of the
+                table. Defaults to 50000.
+        """
+        self.dices = tuple(dices)
+        self.nb_seats = len(dices)
+        self.total = sum(dices)
+        self.nb_bids = 6 * self.total
+        self.nb_actions = 1 + self.nb_bids  # challenge, then each bid
+
+        rolls = [roll_multisets(n) for n in self.dices]
+        sizes = [len(probs) for _, probs in rolls]
+        if math.prod(sizes) > max_rolls:
+            raise ValueError(
+                f"Table {self.dices} has {math.prod(sizes)} joint rolls, "
+                f"more than max_rolls={max_rolls}"
+            )
+
+        # joint rolls, the roll of seat j of joint roll k being roll_idx[k, j]
+        self.roll_idx = np.indices(sizes).reshape(self.nb_seats, -1).T
+        self.roll_p = np.ones(len(self.roll_idx))
+        values_count = np.zeros((len(self.roll_idx), 6), dtype=np.int16)
+        for j, (hists, probs) in enumerate(rolls):
+            self.roll_p *= probs[self.roll_idx[:, j]]
+            values_count += hists[self.roll_idx[:, j]]
+        self.roll_onehot = [
+            (self.roll_idx[:, j] == np.arange(n)[:, None]).astype(np.float64)
+            for j, n in enumerate(sizes)
+        ]
+
+        counts = np.repeat(np.arange(1, self.total + 1), 6)
+        values = np.tile(np.arange(1, 7), self.total)
+        self.bid_valid = values_count[:, values - 1] == counts
+        self.raises = [
+            np.flatnonzero((counts >= counts[b]) & (values >= values[b]))[1:]
+            for b in range(self.nb_bids)
+        ]
+
+        # info sets of seat j: 0 is the first bid, 1 + b the bid b of seat j - 1
+        shape = [(n, 1 + self.nb_bids, self.nb_actions) for n in sizes]
+        self.legal = np.zeros(shape[0][1:], dtype=bool)
+        self.legal[0, 1:] = True
+        for b, raises in enumerate(self.raises):
+            self.legal[1 + b, 0] = True
+            self.legal[1 + b, 1 + raises] = True
+        self.regrets = [np.zeros(s) for s in shape]
+        self.strategy_sum = [np.zeros(s) for s in shape]
+        self.iterations = 0
+
+    def states(self):
+        """States of the round in topological order.
+
+        Returns:
+            list[tupple(int)]: State index, seat to act, info set index and bids
+                that can follow
+        """
+        lst = [(0, 0, 0, np.arange(self.nb_bids))]
+        for b in range(self.nb_bids):
+            for bidder in range(self.nb_seats):
+                lst.append(
+                    (
+                        1 + b * self.nb_seats + bidder,
+                        (bidder + 1) % self.nb_seats,
+                        1 + b,
+                        self.raises[b],
+                    )
+                )
+        return lst
+
+    def current_strategy(self, seat):
+        """Regret matching: plays the actions proportionally to their positive
+        regret, uniformly if none is positive.
+
+        Returns:
+            ndarray: Strategy (rolls x info sets x actions) of the seat
+        """
+        pos = np.maximum(self.regrets[seat], 0) * self.legal
+        total = pos.sum(axis=2, keepdims=True)
+        uniform = self.legal / self.legal.sum(axis=1, keepdims=True)
+        return np.where(total > 0, pos / np.where(total > 0, total, 1), uniform)
+
+    def iterate(self):
+        """Runs an iteration of CFR+: a forward pass computing the probabilities
+        of reaching each state, then a backward pass computing the values and
+        updating the regrets of every information set."""
+        states = self.states()
+        nb_rolls = len(self.roll_p)
+        nb_states = 1 + self.nb_bids * self.nb_seats
+        strategies = [self.current_strategy(j) for j in range(self.nb_seats)]
+
+        def sigma(seat, info, actions):
+            return strategies[seat][self.roll_idx[:, seat], info][:, actions]
+
+        # reach[j]: contribution of every seat but j for each joint roll, own[j]:
+        # of seat j only, which depends on its roll only. States are the rows so
+        # that the updates are contiguous.
+        reach = np.zeros((self.nb_seats, nb_states, nb_rolls))
+        reach[:, 0] = 1
+        own = [np.zeros((nb_states, len(s))) for s in strategies]
+        for o in own:
+            o[0] = 1
+        for s, actor, info, bids in states:
+            children = 1 + bids * self.nb_seats + actor
+            p = sigma(actor, info, 1 + bids).T
+            for j in range(self.nb_seats):
+                if j != actor:
+                    reach[j, children] += reach[j, s] * p
+                else:
+                    reach[j, children] += reach[j, s]
+            own[actor][children] += (
+                own[actor][s] * strategies[actor][:, info, 1 + bids].T
+            )
+            for j in range(self.nb_seats):
+                if j != actor:
+                    own[j][children] += own[j][s]
+
+        self.iterations += 1
+        values = np.zeros((nb_states, nb_rolls, self.nb_seats))
+        rows = np.arange(nb_rolls)
+        for s, actor, info, bids in reversed(states):
+            children = 1 + bids * self.nb_seats + actor
+            actions = 1 + bids
+            child_values = values[children]
+            if s > 0:
+                b, bidder = divmod(s - 1, self.nb_seats)
+                looser = np.where(self.bid_valid[:, b], actor, bidder)
+                challenge = np.zeros((1, nb_rolls, self.nb_seats))
+                challenge[0, rows, looser] = -1
+                child_values = np.concatenate([challenge, child_values])
+                actions = np.concatenate([[0], actions])
+
+            p = sigma(actor, info, actions)
+            values[s] = np.einsum("ka,akp->kp", p, child_values)
+
+            q = child_values[:, :, actor].T
+            w = self.roll_p * reach[actor, s]
+            regrets = self.roll_onehot[actor] @ (
+                w[:, None] * (q - values[s, :, actor, None])
+            )
+            self.regrets[actor][:, info, actions] += regrets
+
+            w = self.iterations * own[actor][s]
+            self.strategy_sum[actor][:, info, actions] += (
+                w[:, None] * strategies[actor][:, info, actions]
+            )
+
+        for r in self.regrets:
+            np.maximum(r, 0, out=r)
+
+        return values
+
+    def solve(self, iterations=500):
+        """Runs CFR+ iterations.
+
+        Args:
+            iterations (int, optional): Number of iterations. Defaults to 500.
+
+        Returns:
+            ndarray: Expected payoff of each seat under the current strategies
+        """
+        for _ in range(iterations):
+            values = self.iterate()
+        return self.roll_p @ values[0]
+
+    def average_policy(self):
+        """Average strategy of the iterations, which converges to an equilibrium.
+        Info sets never reached are played uniformly.
+
+        Returns:
+            list[ndarray]: Policy (rolls x info sets x actions) of each seat
+        """
+        uniform = self.legal / self.legal.sum(axis=1, keepdims=True)
+        policy = []
+        for s in self.strategy_sum:
+            total = s.sum(axis=2, keepdims=True)
+            policy.append(
+                np.where(total > 0, s / np.where(total > 0, total, 1), uniform)
+            )
+        return policy
+
+
+def solve_tables(configs, iterations=500, max_rolls=50000):
+    """Solves the round of every table. The tables with more than max_rolls joint
+    rolls are skipped, SolverCpuPlayer falling back to the ProbabilisticCpuPlayer
+    on them.
+
+    Args:
+        configs (list[tupple(int)]): Number of dices of each seat of each table
+        iterations (int, optional): CFR+ iterations per table. Defaults to 500.
+        max_rolls (int, optional): Largest number of joint rolls of a table.
+            Defaults to 50000.
+
+    Returns:
+        dict[tupple(int), list[ndarray]]: Policy of each seat of each table solved
+    """
+    policies = {}
+    for dices in configs:
+        try:
+            solver = RoundSolver(dices, max_rolls)
+        except ValueError:
+            continue
+        solver.solve(iterations)
+        policies[tuple(dices)] = solver.average_policy()
+    return policies
+
+
+def save_policies(path, policies):
+    """Writes policies to a single file: a JSON header locating each table, then
+    the policies as float16.
+
+    Args:
+        path (str): Output file
+        policies (dict[tupple(int), list[ndarray]]): Policies, see solve_tables
+    """
+    header = {"tables": []}
+    offset = 0
+    for dices, seats in policies.items():
+        for seat, policy in enumerate(seats):
+            header["tables"].append(
+                {
+                    "dices": list(dices),
+                    "seat": seat,
+                    "offset": offset,
+                    "shape": list(policy.shape),
+                }
+            )
+            offset += policy.size
+
+    raw = json.dumps(header).encode()
+    raw += b" " * (-(len(MAGIC) + 4 + len(raw)) % 2)  # aligns the float16 data
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(raw)))
+        f.write(raw)
+        for seats in policies.values():
+            for policy in seats:
+                f.write(policy.astype("<f2").tobytes())
+
+
+class PolicyTable:
+    def __init__(self, path):
+        """Policies written by save_policies. The file is memory-mapped and every
+        table is a view on it, so loading is immediate and only the rows looked up
+        are read.
+
+        Args:
+            path (str): Policy file
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a policy file")
+            (size,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(size))
+
+        data = np.memmap(path, dtype="<f2", mode="r", offset=len(MAGIC) + 4 + size)
+        self.tables = {}
+        for t in header["tables"]:
+            n = math.prod(t["shape"])
+            self.tables[(tuple(t["dices"]), t["seat"])] = data[
+                t["offset"] : t["offset"] + n
+            ].reshape(t["shape"])
+
+    def action_probs(self, dices, seat, dices_counts, last_bid):
+        """Looks up the policy of a player.
+
+        Args:
+            dices (tupple(int)): Number of dices of each seat, seat 0 starting
+            seat (int): Seat of the player
+            dices_counts (ndarray): Number of the player's dices showing each value,
+                see Player.dices_counts
+            last_bid (object Bid): Last bid, with a None bidder before the first bid
+
+        Returns:
+            ndarray: Probabilities of challenging (index 0) and of each bid
+                (index 1 + bid_code), None if the situation is not in the table
+        """
+        table = self.tables.get((tuple(dices), seat))
+        if table is None:
+            return None
+
+        info = 0
+        if last_bid.bidder is not None:
+            if not (1 <= last_bid.count <= sum(dices) and 1 <= last_bid.value <= 6):
+                return None
+            info = 1 + bid_code(last_bid.count, last_bid.value)
+
+        hist = tuple(int(c) for c in dices_counts[1:])
+        roll = roll_index(sum(hist))[hist]
+
+        p = table[roll, info].astype(np.float64)
+        return p / p.sum()
+
+
+class SolverCpuPlayer(ProbabilisticCpuPlayer):
+    # Policy file written by solve_policies.py, loaded once by the first player
+    policy_path = "policy.bin"
+    policy = None
+
+    __slots__ = ("table", "seat", "action")
+
+    def __init__(self, name, nb_dices, headless=False, rng=None, max_dices=64):
+        """Constructor for the solver cpu player class. Plays the precomputed
+        equilibrium policy of the table when it is in the policy file, and falls
+        back to the ProbabilisticCpuPlayer otherwise.
+
+        Args:
+            name (str): Player's name
+            nb_dices (int): Player's initial number of dices
+            headless (bool, optional): Disables printing and pauses. Defaults to False.
+            rng (np.random.Generator, optional): Random generator of the player.
+                Defaults to a freshly seeded one.
+            max_dices (int, optional): Largest number of dices in a game.
+                Defaults to 64.
+        """
+        super().__init__(name, nb_dices, headless, rng, max_dices)
+        if SolverCpuPlayer.policy is None:
+            SolverCpuPlayer.policy = PolicyTable(self.policy_path)
+        self.table = None
+        self.seat = None
+        self.action = None
+
+    def observe_table(self, dices, seat):
+        self.table = tuple(dices)
+        self.seat = seat
+
+    def choose_action(self, last_bid):
+        """Samples the action of the policy.
+
+        Returns:
+            int: 0 to challenge, 1 + bid_code to bid, None outside the policy
+        """
+        if self.table is None:
+            return None
+        p = self.policy.action_probs(self.table, self.seat, self.dices_counts, last_bid)
+        if p is None:
+            return None
+        return int(self.rng.choice(len(p), p=p))
+
+    def challenge_last_bid(self, last_bid, total_nb_dice):
+        """Challenges the last bid following the policy.
+
+        Args:
+            last_bid (object Bid): Last bid
+            total_nb_dice (int): Total number of dices in the game
+
+        Returns:
+            object Bid: Updated last bid
+        """
+        self.action = self.choose_action(last_bid)
+        if self.action is None:
+            return super().challenge_last_bid(last_bid, total_nb_dice)
+
+        if self.action == 0:
+            last_bid.challenger = self.player_id
+        return last_bid
+
+    def place_bid(self, last_bid, total_nb_dice):
+        """Places the bid chosen by the policy.
+
+        Args:
+            last_bid (object Bid): Last bid
+            total_nb_dice (int): Total number of dices in the game
+
+        Returns:
+            object Bid: Updated last bid
+        """
+        if last_bid.bidder is None:
+            self.action = self.choose_action(last_bid)
+        action, self.action = self.action, None
+        if not action:
+            return super().place_bid(last_bid, total_nb_dice)
+
+        count, value = divmod(action - 1, 6)
+        bid = Bid(self.player_id, count + 1, value + 1)
+
+        if last_bid.bidder is not None:
+            self.say(f"{self.name} raised the bid to {bid.count} {bid.value}")
+        else:
+            self.say(f"{self.name} placed a first bid of {bid.count} {bid.value}")
+
+        self.pause(0.5)
+
+        return bid
@@ -0,0 +1,214 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.gameplay import Game
+
+
+def play_shard(strategies, nb_seats, nb_dices, nb_games, first_game, seed_seq):
+    """Plays a shard of headless games until a single player remains. Executed in
+    the worker processes.
+
+    Strategies rotate over the seats from one game to the next, seat j of game i
+    being played by strategies[(i + j) % len(strategies)].
+
+    Args:
+        strategies (list[type]): Player classes competing
+        nb_seats (int): Number of players per game
+        nb_dices (int): Initial number of dices for each player
+        nb_games (int): Number of games of the shard
+        first_game (int): Index of the first game of the shard
+        seed_seq (np.random.SeedSequence): Seed of the shard's random stream
+
+    Returns:
+        dict: Wins and seats played by each strategy, and round length sums
+    """
+    rng = np.random.default_rng(seed_seq)
+    nb_strategies = len(strategies)
+
+    wins = np.zeros(nb_strategies, dtype=np.int64)
+    seats = np.zeros(nb_strategies, dtype=np.int64)
+    rounds = np.zeros(nb_games, dtype=np.int64)
+
+    for g in range(nb_games):
+        idx = [(first_game + g + j) % nb_strategies for j in range(nb_seats)]
+        seat0 = strategies[idx[0]](
+            name="seat0", nb_dices=nb_dices, headless=True, rng=rng
+        )
+        game = Game(
+            None,
+            nb_seats - 1,
+            nb_dices,
+            headless=True,
+            human_player=seat0,
+            cpu_player_cls=[strategies[i] for i in idx[1:]],
+            rng=rng,
+        )
+        players = [game.human_player] + game.cpu_players
+        winner = game.play(until_last_standing=True)
+
+        np.add.at(seats, idx, 1)
+        wins[idx[players.index(winner)]] += 1
+        rounds[g] = game.round - 1
+
+    return {
+        "wins": wins,
+        "seats": seats,
+        "games": nb_games,
+        "rounds_sum": int(rounds.sum()),
+        "rounds_sumsq": int((rounds**2).sum()),
+    }
+
+
+def wilson_interval(wins, n, z=1.96):
+    """Wilson score confidence interval of a win rate.
+
+    Args:
+        wins (int): Number of wins
+        n (int): Number of trials
+        z (float, optional): Normal quantile of the confidence level. Defaults to
+            1.96 for 95%.
+
+    Returns:
+        tuple(float, float): Lower and upper bounds
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    center = (p + z**2 / (2 * n)) / (1 + z**2 / n)
+    half = z * math.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+    return center - half, center + half
+
+
+class TournamentStats:
+    def __init__(self, strategies):
+        """Aggregates the results of the shards of a tournament.
+
+        Args:
+            strategies (list[type]): Player classes competing
+        """
+        self.names = [s.__name__ for s in strategies]
+        self.wins = np.zeros(len(strategies), dtype=np.int64)
+        self.seats = np.zeros(len(strategies), dtype=np.int64)
+        self.games = 0
+        self.rounds_sum = 0
+        self.rounds_sumsq = 0
+
+    def add(self, shard):
+        """Adds the results of a shard, as returned by play_shard"""
+        self.wins += shard["wins"]
+        self.seats += shard["seats"]
+        self.games += shard["games"]
+        self.rounds_sum += shard["rounds_sum"]
+        self.rounds_sumsq += shard["rounds_sumsq"]
+
+    def intervals(self):
+        """Returns:
+        list[tupple(float, float)]: Win rate confidence interval of each strategy
+        """
+        return [wilson_interval(w, n) for w, n in zip(self.wins, self.seats)]
+
+    def separated(self):
+        """Returns:
+        bool: Whether the confidence intervals of all strategies are disjoint
+        """
+        bounds = sorted(self.intervals())
+        return all(a[1] < b[0] for a, b in zip(bounds, bounds[1:]))
+
+    def summary(self):
+        """Returns:
+        dict: Win rates with their confidence intervals and round statistics
+        """
+        mean = self.rounds_sum / max(self.games, 1)
+        var = self.rounds_sumsq / max(self.games, 1) - mean**2
+        return {
+            "games": self.games,
+            "rounds_mean": mean,
+            "rounds_std": math.sqrt(max(var, 0.0)),
+            "strategies": {
+                name: {
+                    "win_rate": w / n if n else 0.0,
+                    "ci95": ci,
+                    "seats": int(n),
+                }
+                for name, w, n, ci in zip(
+                    self.names, self.wins, self.seats, self.intervals()
+                )
+            },
+        }
+
+
+def run_tournament(
+    strategies,
+    nb_seats,
+    nb_dices,
+    nb_games,
+    workers=None,
+    shard_size=500,
+    seed=0,
+    early_stop=True,
+    min_games=1000,
+):
+    """Plays seeded headless games between strategies on a pool of processes.
+
+    Every shard draws from its own stream, spawned from a single SeedSequence, and
+    the shards are aggregated in submission order, so the results only depend on
+    the seed. Aggregation is incremental and the tournament stops early once the
+    win rate confidence intervals of all strategies are disjoint.
+
+    Args:
+        strategies (list[type]): Player classes competing
+        nb_seats (int): Number of players per game
+        nb_dices (int): Initial number of dices for each player
+        nb_games (int): Maximum number of games
+        workers (int, optional): Number of processes. Defaults to the number of CPUs.
+        shard_size (int, optional): Number of games per task. Defaults to 500.
+        seed (int, optional): Root seed. Defaults to 0.
+        early_stop (bool, optional): Stops once the intervals separate.
+            Defaults to True.
+        min_games (int, optional): Games played before early stopping is
+            considered. Defaults to 1000.
+
+    Returns:
+        dict: Summary, see TournamentStats.summary
+    """
+    workers = workers or os.cpu_count()
+    root = np.random.SeedSequence(seed)
+    stats = TournamentStats(strategies)
+
+    pending = deque()
+    next_game = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def submit():
+            nonlocal next_game
+            n = min(shard_size, nb_games - next_game)
+            pending.append(
+                executor.submit(
+                    play_shard,
+                    strategies,
+                    nb_seats,
+                    nb_dices,
+                    n,
+                    next_game,
+                    root.spawn(1)[0],
+                )
+            )
+            next_game += n
+
+        while next_game < nb_games and len(pending) < 2 * workers:
+            submit()
+
+        while pending:
+            stats.add(pending.popleft().result())
+            if early_stop and stats.games >= min_games and stats.separated():
+                for future in pending:
+                    future.cancel()
+                break
+            if next_game < nb_games:
+                submit()
+
+    return stats.summary()
@@ -0,0 +1,194 @@
+from collections import deque
+
+import numpy as np
+
+
+class ValueChange:
+    def __init__(self, track_id, value, previous_value, center):
+        """Event emitted when the stable value of a tracked dice changes.
+
+        Args:
+            track_id (int): Id of the track
+            value (int): New stable value, None if the dice disappeared
+            previous_value (int): Previous stable value, None if the dice just
+                became stable
+            center (tupple(float)): Last known center of the dice (row, col)
+        """
+        self.track_id = track_id
+        self.value = value
+        self.previous_value = previous_value
+        self.center = center
+
+    def __repr__(self):
+        return (
+            f"ValueChange(track_id={self.track_id}, value={self.value}, "
+            f"previous_value={self.previous_value})"
+        )
+
+
+class Track:
+    def __init__(self, track_id, dice, confirm_frames):
+        """A dice followed across frames.
+
+        Args:
+            track_id (int): Id of the track
+            dice (Dice): First detection of the dice, its value is added with update
+            confirm_frames (int): Number of consecutive identical readings needed
+                for a value to become stable
+        """
+        self.track_id = track_id
+        self.center = dice.center
+        self.bbox = dice.bbox
+        self.values = deque(maxlen=confirm_frames)
+        self.stable_value = None
+        self.missed = 0
+
+    def update(self, dice):
+        """Adds a new detection of the dice.
+
+        Args:
+            dice (Dice): Detection associated to the track
+
+        Returns:
+            bool: Whether the stable value changed
+        """
+        self.center = dice.center
+        self.bbox = dice.bbox
+        self.values.append(dice.value)
+        self.missed = 0
+
+        value = self.values[0]
+        if (
+            value is not None
+            and value != self.stable_value
+            and len(self.values) == self.values.maxlen
+            and all(v == value for v in self.values)
+        ):
+            self.stable_value = value
+            return True
+
+        return False
+
+
+class DiceTracker:
+    def __init__(self, confirm_frames=5, max_distance=30.0, max_missed=10):
+        """Follows the dices detected on successive frames and debounces their
+        values: a value becomes stable after being read on confirm_frames
+        consecutive frames, and events are only emitted when a stable value changes.
+
+        Detections are associated to tracks by centroid distance, greedily from the
+        closest pair.
+
+        Args:
+            confirm_frames (int, optional): Number of consecutive identical readings
+                needed for a value to become stable. Defaults to 5.
+            max_distance (float, optional): Maximum centroid distance in pixels
+                between a track and a detection. Defaults to 30.0.
+            max_missed (int, optional): Number of frames a track survives without
+                detection. Defaults to 10.
+        """
+        self.confirm_frames = confirm_frames
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+
+        self.tracks = []
+        self.next_id = 0
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """Registers a function called with every ValueChange event.
+
+        Args:
+            callback (callable): Function taking a ValueChange
+        """
+        self.subscribers.append(callback)
+
+    def _associate(self, obj_lst):
+        """Matches detections to tracks by increasing centroid distance.
+
+        Returns:
+            list[tupple(int, int)]: Pairs of track and detection indices
+        """
+        if not self.tracks or not obj_lst:
+            return []
+
+        tracks = np.array([t.center for t in self.tracks], dtype=np.float32)
+        dets = np.array([d.center for d in obj_lst], dtype=np.float32)
+        dist = np.linalg.norm(tracks[:, None, :] - dets[None, :, :], axis=2)
+
+        pairs = []
+        used_tracks, used_dets = set(), set()
+        for flat in np.argsort(dist, axis=None):
+            i, j = divmod(int(flat), len(obj_lst))
+            if dist[i, j] > self.max_distance:
+                break
+            if i not in used_tracks and j not in used_dets:
+                pairs.append((i, j))
+                used_tracks.add(i)
+                used_dets.add(j)
+
+        return pairs
+
+    def update(self, obj_lst):
+        """Updates the tracks with the dices detected on a new frame.
+
+        Args:
+            obj_lst (list[Dice]): Dices detected on the frame
+
+        Returns:
+            list[ValueChange]: Events emitted by this frame
+        """
+        pairs = self._associate(obj_lst)
+        matched_tracks = {i for i, _ in pairs}
+        matched_dets = {j for _, j in pairs}
+
+        updates = [(self.tracks[i], obj_lst[j]) for i, j in pairs]
+        new_tracks = []
+        for j, dice in enumerate(obj_lst):
+            if j not in matched_dets:
+                track = Track(self.next_id, dice, self.confirm_frames)
+                self.next_id += 1
+                new_tracks.append(track)
+                updates.append((track, dice))
+
+        events = []
+        for track, dice in updates:
+            previous = track.stable_value
+            if track.update(dice):
+                events.append(
+                    ValueChange(
+                        track.track_id, track.stable_value, previous, track.center
+                    )
+                )
+
+        alive = []
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    if track.stable_value is not None:
+                        events.append(
+                            ValueChange(
+                                track.track_id, None, track.stable_value, track.center
+                            )
+                        )
+                    continue
+            alive.append(track)
+
+        self.tracks = alive + new_tracks
+
+        for event in events:
+            for callback in self.subscribers:
+                callback(event)
+
+        return events
+
+    def stable_values(self):
+        """Returns:
+        dict[int, int]: Stable value of each track that has one
+        """
+        return {
+            t.track_id: t.stable_value
+            for t in self.tracks
+            if t.stable_value is not None
+        }
@@ -0,0 +1,44 @@
+import argparse
+import json
+import time
+
+from src import gameplay, solver
+from src.tournament import run_tournament
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compares cpu player strategies")
+    parser.add_argument(
+        "strategies",
+        nargs="+",
+        help="names of the player classes of src.gameplay or src.solver, e.g. CpuPlayer",
+    )
+    parser.add_argument("--seats", type=int, nargs="+", default=[2])
+    parser.add_argument("--dices", type=int, default=3)
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-early-stop", action="store_true")
+    args = parser.parse_args()
+
+    strategies = [
+        getattr(gameplay, name, None) or getattr(solver, name)
+        for name in args.strategies
+    ]
+
+    for nb_seats in args.seats:
+        t0 = time.perf_counter()
+        summary = run_tournament(
+            strategies,
+            nb_seats,
+            args.dices,
+            args.games,
+            workers=args.workers,
+            shard_size=args.shard_size,
+            seed=args.seed,
+            early_stop=not args.no_early_stop,
+        )
+        summary["seats_per_game"] = nb_seats
+        summary["seconds"] = time.perf_counter() - t0
+        print(json.dumps(summary, indent=4))